@@ -1,22 +1,442 @@
 import asyncio
+import contextlib
+import functools
+import itertools
 import json
 import logging
 import re
+import string
+import textwrap
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
-from enum import Enum
+from enum import Enum, IntEnum
 import time
+from collections import Counter, deque
+from dataclasses import dataclass
 
 from tree import MemoryTree, MemoryNode, NodeStatus
 from tasklist import TaskQueue, Task, TaskPriority, TaskStatus
 from gemini_client import GeminiClient
-from agentview import AgentViewController, AgentAccessLevel, NodeSummary, MemoryCluster
+from agentview import AgentViewController, AgentAccessLevel, NodeSummary, MemoryCluster, ClusterStats
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib codec
+    orjson = None
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Task-description keywords used for loop detection, mapped to the task type
+# they indicate; checked in order so earlier keywords win
+LOOP_KEYWORD_BUCKETS = {
+    'afis': 'fingerprint',
+    'fingerprint': 'fingerprint',
+    'alibi': 'alibi',
+    'verify': 'alibi',
+    'fabric': 'fabric',
+    'interview': 'interview'
+}
+
+
+# Priority names as emitted in LLM task JSON
+TASK_PRIORITIES = dict(TaskPriority.__members__)
+
+# Keywords that make two task descriptions candidates for repetition
+REPETITION_KEYWORD_RE = re.compile('afis|alibi|fingerprint|verify|analyze|investigate')
+
+# Jaccard similarity above which a new task repeats a recent one
+REPETITION_THRESHOLD = 0.3  # Lowered from 0.4 - be more strict
+
+# IMPROVED shallow detection - only truly shallow terms
+SHALLOW_INDICATOR_RE = re.compile(
+    'general overview|broad analysis|comprehensive review|'
+    'overall assessment|complete investigation|full examination'
+)
+
+# Phrases showing a task targets specific existing nodes
+DEPTH_INDICATOR_RE = re.compile(
+    'specific|detailed|sub-analysis|deeper|granular|'
+    'cross-reference|correlate|connect|extend|build on|'
+    'analyze|examine|investigate|review'  # Allow core investigative terms
+)
+
+# Specific evidence types or analysis areas that get scheduled first
+PRIORITY_INDICATOR_RE = re.compile(
+    'fingerprint analysis|fabric analysis|timeline correlation|'
+    'motive analysis|appointment details|witness statement cross-reference'
+)
+
+
+class NodeCategory(IntEnum):
+    """Content categories for a new memory node, in matching priority order"""
+    EVIDENCE = 0
+    SUSPECT = 1
+    TIMELINE = 2
+    ANALYSIS = 3
+    OTHER = 4
+
+
+# Content categories for a new memory node
+EVIDENCE_NODE_RE = re.compile('evidence|forensic|fingerprint|weapon|fabric|soil')
+SUSPECT_NODE_RE = re.compile('hartwell|robert|suspect|motive')
+TIMELINE_NODE_RE = re.compile('timeline|appointment|time|alibi')
+ANALYSIS_NODE_RE = re.compile('analysis|conclusion|synthesis')
+
+# Content that makes an existing node a fitting parent for each category
+EVIDENCE_PARENT_RE = re.compile('evidence|forensic|investigation')
+TIMELINE_PARENT_RE = re.compile('timeline|appointment|time')
+ANALYSIS_PARENT_RE = re.compile('analysis|synthesis')
+
+# (category, new node pattern, parent pattern, parent bonus) in priority order
+NODE_CATEGORY_RULES = (
+    (NodeCategory.EVIDENCE, EVIDENCE_NODE_RE, EVIDENCE_PARENT_RE, 5),  # Increased from 3
+    (NodeCategory.SUSPECT, SUSPECT_NODE_RE, SUSPECT_NODE_RE, 5),  # Increased from 3
+    (NodeCategory.TIMELINE, TIMELINE_NODE_RE, TIMELINE_PARENT_RE, 5),  # Increased from 3
+    (NodeCategory.ANALYSIS, ANALYSIS_NODE_RE, ANALYSIS_PARENT_RE, 4),  # Increased from 2
+)
+
+# Parent score adjustment by node depth: penalty for shallow nodes, good bonus
+# for depth 1, HUGE bonus for depth 2+
+PARENT_DEPTH_BONUS = (-5, 5, 10)
+
+# Parent selection counts depth only up to here, like the original capped parent walk;
+# deeper nodes all rank as this deep
+MAX_COUNTED_DEPTH = 11
+
+
+def parent_category_mask(content_lower: str) -> int:
+    """Get the bitmask of categories a node with this content is a fitting parent for"""
+    mask = 0
+    for category, _, parent_pattern, _ in NODE_CATEGORY_RULES:
+        if parent_pattern.search(content_lower):
+            mask |= 1 << category
+    return mask
+
+
+# Context labels for each file access level
+FILE_ACCESS_LABELS = {
+    "read_only": "[Full Access]",
+    "metadata_only": "[Metadata Only]"
+}
+
+
+# Characters that affect brace balancing inside a JSON candidate
+JSON_STRUCTURAL_RE = re.compile(r'[{}"\\]')
+
+# Fallback pattern for JSON in json-tagged or generic code fences
+JSON_FENCE_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+
+
+def find_json_span(text: str, start: int = 0) -> Optional[Tuple[int, int]]:
+    """Find the first balanced {...} span at or after start, ignoring braces inside strings"""
+    begin = text.find('{', start)
+    if begin == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped_index = -1
+    
+    # Jump between structural characters instead of walking every character
+    for match in JSON_STRUCTURAL_RE.finditer(text, begin):
+        index = match.start()
+        if index == escaped_index:
+            continue
+        
+        char = match.group()
+        if in_string:
+            if char == '\\':
+                escaped_index = index + 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return begin, index + 1
+    
+    return None
+
+
+def loads_json(text: str) -> Any:
+    """Parse JSON with orjson when available; both codecs raise json.JSONDecodeError"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def dumps_json_compact(value: Any) -> str:
+    """Serialize to compact JSON with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(value, separators=(',', ':'), default=str)
+
+
+@functools.lru_cache(maxsize=1024)
+def description_tokens(description: str) -> frozenset:
+    """Lowercased token set of a task description, cached across filter calls"""
+    return frozenset(description.lower().split())
+
+
+def jaccard_similarity(first: frozenset, second: frozenset) -> float:
+    """Jaccard similarity of two token sets via inclusion-exclusion"""
+    intersection = len(first & second)
+    union = len(first) + len(second) - intersection
+    return intersection / union if union else 0.0
+
+
+def preview_text(text: str, width: int = 500) -> str:
+    """Shorten text on a word boundary for embedding in prompts"""
+    if len(text) <= width:
+        return text
+    # Only the head can survive shortening, so don't collapse the whole string
+    return textwrap.shorten(text[:width * 2], width=width, placeholder='...')
+
+
+def response_to_text(response: Any) -> str:
+    """Return the text of a model response without stringifying the whole object"""
+    if isinstance(response, str):
+        return response
+    return getattr(response, "text", None) or str(response)
+
+
+class JsonStreamScanner:
+    """Incremental brace-balance scanner that finds {...} spans as streamed text arrives"""
+    
+    def __init__(self):
+        self.text = ""
+        self._reset(0)
+    
+    def _reset(self, position: int):
+        """Restart scanning for a new object at position"""
+        self.begin = -1
+        self.position = position
+        self.depth = 0
+        self.in_string = False
+        self.escaped_index = -1
+    
+    def feed(self, chunk: str):
+        """Append a chunk and yield each newly balanced span; resuming after a yield rejects that span"""
+        self.text += chunk
+        while True:
+            if self.begin == -1:
+                self.begin = self.text.find('{', self.position)
+                if self.begin == -1:
+                    self.position = len(self.text)
+                    return
+                self.position = self.begin
+            
+            span_end = None
+            for match in JSON_STRUCTURAL_RE.finditer(self.text, self.position):
+                index = match.start()
+                if index == self.escaped_index:
+                    continue
+                
+                char = match.group()
+                if self.in_string:
+                    if char == '\\':
+                        self.escaped_index = index + 1
+                    elif char == '"':
+                        self.in_string = False
+                elif char == '"':
+                    self.in_string = True
+                elif char == '{':
+                    self.depth += 1
+                elif char == '}':
+                    self.depth -= 1
+                    if self.depth == 0:
+                        span_end = index + 1
+                        break
+            
+            if span_end is None:
+                # Resume from the end of the buffer once more text arrives
+                self.position = len(self.text)
+                return
+            
+            yield self.text[self.begin:span_end]
+            
+            # Span was rejected by the caller - look for the next object
+            self._reset(self.begin + 1)
+
+
+# Static shell of the initial planning prompt; only the agent view and
+# investigation context change per call
+PLANNING_PROMPT_TEMPLATE = string.Template("""
+            You are the Planner Agent creating an investigation plan for a CASE FILE ANALYSIS simulation.
+
+            CURRENT AGENT VIEW:
+            $agent_context
+            
+            INVESTIGATION CONTEXT:
+            $investigation_context
+            
+            🌳 STRATEGIC TASK CREATION FOR MINDMAP BUILDING:
+            - Maximum 5 initial tasks
+            - Create tasks that build LOGICAL HIERARCHY using similarity connections
+            - Focus on specific evidence categories identified in clusters above
+            - Each task should explore or connect to hot spots and unexplored areas
+            - Use navigation suggestions to guide task creation
+            - DO NOT create tasks asking for external information beyond available files
+            
+            Example good tasks based on your current view:
+            - "Deep dive into [specific cluster] evidence connections"
+            - "Explore contradictions in [specific cluster with flags]"
+            - "Analyze hot spot: [specific hot spot title]"
+            
+            Respond in JSON format:
+            {
+                "tasks": [
+                    {
+                        "description": "Case file analysis task description",
+                        "instructions": "Detailed instructions for analyzing available case data",
+                        "priority": "HIGH|MEDIUM|LOW"
+                    }
+                ]
+            }
+            """)
+
+# Static shell of the per-task refinement prompt
+REFINEMENT_PROMPT_TEMPLATE = string.Template("""
+            You are the Planner Agent refining the investigation plan with DEPTH-FOCUSED approach.
+            
+            COMPLETED TASK: $task_description
+            RESULT: $result_preview
+            
+            CURRENT STATE:
+            - Memory tree: $total_nodes nodes, depth $max_depth
+            - Total completed tasks: $total_tasks
+            
+            SYNTHESIS GUIDANCE:
+            $guidance_text
+            
+            🌳 AGGRESSIVE DEPTH-FORCING REFINEMENT:
+            - FORCE DEEP HIERARCHY: Only create tasks that extend leaf nodes or shallow branches
+            - MANDATORY DEPTH EXTENSION: Every task MUST target a specific existing node for deepening
+            - ZERO BREADTH TOLERANCE: No new top-level categories, only sub-analysis of existing nodes
+            - DEPTH REQUIREMENT: Tasks must create at least 2-3 levels of sub-analysis
+            - Maximum $max_tasks_per_cycle DEPTH-FOCUSED tasks per refinement
+            - AGGRESSIVE TARGETING: Identify the shallowest analysis nodes and force deeper exploration
+            
+            Aggressive Depth Strategy:
+            1. If confidence < 0.7: Force deep dive into weakest evidence branches (3+ levels)
+            2. If confidence 0.7-0.8: Create sub-sub-analysis that connects evidence chains deeply
+            3. If confidence > 0.8: Create nested conclusion hierarchies summarizing evidence trees
+            
+            Should you create new tasks? Consider:
+            1. Do we have sufficient evidence depth on key points?
+            2. Are there critical logical gaps in the evidence chain?
+            3. Can we connect existing evidence more strongly?
+            
+            Respond in JSON format:
+            {
+                "should_continue": true/false,
+                "reasoning": "why continue or stop",
+                "evidence_focus": "what evidence needs strengthening",
+                "new_tasks": [
+                    {
+                        "description": "specific evidence task",
+                        "instructions": "detailed analysis instructions", 
+                        "priority": "HIGH|MEDIUM|LOW",
+                        "builds_on": "which existing node this extends"
+                    }
+                ]
+            }
+            """)
+
+
+# Ready tasks executed concurrently per round in AgentSystem.process_query
+EXECUTION_BATCH_SIZE = 3
+
+
+# Synthesis confidence bonuses, in the order the factors are checked
+CONFIDENCE_ADJUSTMENTS = (
+    (0.10, "high cluster completion"),
+    (0.08, "contradiction management"),
+    (0.05, "developed hot spots"),
+    (0.07, "strong similarity network"),
+)
+
+
+# Static shell of the synthesis analysis prompt
+SYNTHESIS_PROMPT_TEMPLATE = string.Template("""
+            You are the Synthesis Agent conducting ENHANCED strategic analysis using similarity-based insights.
+            
+            CURRENT INVESTIGATION STATE:
+            $agent_context
+            
+            SIMILARITY-BASED ANALYSIS:
+            - Evidence clusters: $cluster_count total
+            - Cluster completion rate: $cluster_completion_rate ($cluster_completeness/$cluster_count fully explored)
+            - Active contradictions: $contradiction_count across clusters
+            - Unexplored nodes: $unexplored_count remaining
+            - Investigation hot spots: $hot_spot_count high-connection areas
+            - Total tasks completed: $total_tasks
+            - Analysis round: $analysis_count
+            
+            CLUSTER-BASED EVIDENCE EVALUATION:
+            $cluster_analysis
+            
+            HOT SPOT ANALYSIS:
+            $hotspot_analysis
+            
+            ENHANCED SYNTHESIS FRAMEWORK:
+            - CLUSTER STRENGTH: How well are evidence clusters developed and explored?
+            - CONTRADICTION RESOLUTION: Are contradictions being addressed effectively?  
+            - HOT SPOT DEVELOPMENT: Are high-connection areas being properly analyzed?
+            - SIMILARITY NETWORK: How well connected is the evidence through similarity?
+            - OVERALL CONFIDENCE: Based on cluster completeness and contradiction resolution
+            
+            STOPPING CRITERIA (Similarity-Based):
+            - All major clusters fully explored (completion rate > 0.8)
+            - Contradictions resolved or acknowledged (< 2 unresolved contradictions)
+            - Hot spots adequately analyzed (all hot spots have sufficient children)
+            - High similarity network connectivity across evidence types
+            
+            Respond in JSON format:
+            {
+                "cluster_strength": 0.0-1.0,
+                "contradiction_resolution": 0.0-1.0,
+                "hotspot_development": 0.0-1.0,
+                "similarity_network_strength": 0.0-1.0,
+                "confidence_level": 0.0-1.0,
+                "key_patterns": ["concrete pattern1", "concrete pattern2"],
+                "unresolved_contradictions": ["specific contradiction1", "specific contradiction2"],
+                "strategic_recommendation": "CONTINUE|CONCLUDE|FOCUS",
+                "priority_focus": "specific area needing attention",
+                "reasoning": "detailed logical explanation based on clusters and similarities"
+            }
+            """)
+
+
+# Synthesis conclusion narrative - only the per-round fields are filled in with format()
+SYNTHESIS_CONCLUSION_TEMPLATE = """
+            SYNTHESIS INVESTIGATION CONCLUSION (Confidence: {confidence:.2f})
+            
+            FINAL ANALYSIS COMPLETE:
+            
+            Key Patterns: {patterns}
+            
+            SUMMARY:
+            Based on {confidence:.0%} confidence analysis, the investigation has reached a conclusion.
+            
+            Key Findings:
+            - Evidence has been systematically analyzed
+            - Pattern recognition has identified key connections
+            - Confidence threshold reached for conclusions
+            - Investigation objectives satisfied
+            
+            RECOMMENDATION: Review findings and determine next steps based on case type
+            
+            Reasoning: {reasoning}
+            """
+
+
 class AgentType(Enum):
     """Types of agents in the system"""
     PLANNER = "planner"
@@ -24,37 +444,106 @@ class AgentType(Enum):
     SYNTHESIS = "synthesis"
 
 
+@dataclass(slots=True)
+class MemoryUpdate:
+    """Single memory update requested by the executor response"""
+    action: Optional[str] = None
+    node_name: Optional[str] = None
+    description: Optional[str] = None
+    parent_node_id: Optional[str] = None
+    node_id: Optional[str] = None
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MemoryUpdate':
+        """Create update from parsed JSON"""
+        return cls(
+            action=data.get("action"),
+            node_name=data.get("node_name"),
+            description=data.get("description"),
+            parent_node_id=data.get("parent_node_id"),
+            node_id=data.get("node_id")
+        )
+
+
 class ExecutionResult:
     """Result of task execution"""
-    def __init__(self, success: bool, result: str, memory_updates: List[Dict] = None):
+    def __init__(self, success: bool, result: str, memory_updates: List[MemoryUpdate] = None):
         self.success = success
         self.result = result
         self.memory_updates = memory_updates or []
         self.timestamp = datetime.now()
 
 
+# Most recent execution log entries kept per agent
+EXECUTION_HISTORY_LIMIT = 1024
+
+# Rendered contexts kept per agent for the current tree/queue state
+CONTEXT_CACHE_SIZE = 128
+
+
 class BaseAgent:
     """Base class for all AI agents"""
     
+    # Shared sequence so every agent instance gets a unique id
+    _agent_sequence = itertools.count()
+    
     def __init__(self, agent_name: str, client: GeminiClient, memory_tree: MemoryTree, view_controller: AgentViewController = None):
         self.agent_name = agent_name
         self.client = client
         self.memory_tree = memory_tree
         self.view_controller = view_controller
         self.context_bank: Dict[str, str] = {}
-        self.execution_history: List[Dict] = []
-        self.agent_id = f"{agent_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.execution_history: deque = deque(maxlen=EXECUTION_HISTORY_LIMIT)
+        self.agent_id = f"{agent_name}_{next(BaseAgent._agent_sequence)}"
+        self._log_buffer: Optional[List[Dict]] = None  # Set while execution logs are batched
+        # (state_version, {query_context: rendered context}); a tree or queue
+        # mutation bumps the version, which drops every rendered context
+        self._context_cache: Tuple[Optional[Tuple[int, int]], Dict[Optional[str], str]] = (None, {})
         
     def _log_execution(self, action: str, details: Dict[str, Any]):
         """Log agent execution for monitoring"""
         log_entry = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp_ns': time.time_ns(),
             'agent_type': self.agent_name,
             'action': action,
             'details': details
         }
+        if self._log_buffer is not None:
+            self._log_buffer.append(log_entry)
+            return
+        
         self.execution_history.append(log_entry)
-        logger.info(f"[{self.agent_name.upper()}] {action}: {details}")
+        logger.info("[%s] %s: %s", self.agent_name.upper(), action, details)
+    
+    @contextlib.contextmanager
+    def _batched_logging(self):
+        """Buffer execution logs and flush them as a single record on exit"""
+        if self._log_buffer is not None:
+            # Already batching - the outermost block flushes
+            yield
+            return
+        
+        self._log_buffer = []
+        try:
+            yield
+        finally:
+            log_entries, self._log_buffer = self._log_buffer, None
+            self._flush_log_entries(log_entries)
+    
+    def _flush_log_entries(self, log_entries: List[Dict]):
+        """Record buffered execution logs and emit them in one log call"""
+        if not log_entries:
+            return
+        
+        self.execution_history.extend(log_entries)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[%s] %s", self.agent_name.upper(), "\n  ".join(
+                f"{entry['action']}: {entry['details']}" for entry in log_entries
+            ))
+    
+    def get_execution_history(self) -> List[Dict]:
+        """Get the retained execution log entries, oldest first"""
+        return list(self.execution_history)
     
     def _build_context(self, query_context: str = None) -> str:
         """Build context using agent view controller"""
@@ -69,24 +558,35 @@ class BaseAgent:
             
             return "\n".join(context_parts)
         
-        # Use view controller to get agent-specific view
-        agent_view = self.view_controller.get_agent_view(
-            agent_id=self.agent_id,
-            agent_type=self._get_access_level(),
-            query_context=query_context
-        )
+        state_version = self.view_controller.get_state_version()
+        cached_version, rendered = self._context_cache
+        if cached_version != state_version or len(rendered) >= CONTEXT_CACHE_SIZE:
+            rendered = {}
+            self._context_cache = (state_version, rendered)
         
+        context = rendered.get(query_context)
+        if context is None:
+            context = rendered[query_context] = self._render_context(query_context)
+        return context
+    
+    def _render_context(self, query_context: Optional[str]) -> str:
+        """Render the agent-specific view into prompt context"""
+        # Use view controller to get agent-specific view
+        agent_view = self._get_memory_view(query_context=query_context)
+        return self._build_context_from_view(agent_view)
+    
+    def _build_context_from_view(self, agent_view: Dict) -> str:
+        """Format an already-fetched agent view as prompt context"""
         context_parts = []
         
         # Add file access info
         if agent_view.get("available_files"):
             context_parts.append("AVAILABLE FILES:")
-            for file_info in agent_view["available_files"]:
-                access_level = file_info["access_level"]
-                if access_level == "read_only":
-                    context_parts.append(f"  • {file_info['filename']}: {file_info['description']} [Full Access]")
-                else:
-                    context_parts.append(f"  • {file_info['filename']}: {file_info['description']} [Metadata Only]")
+            context_parts.extend(
+                f"  • {file_info['filename']}: {file_info['description']} "
+                f"{FILE_ACCESS_LABELS.get(file_info['access_level'], '[Metadata Only]')}"
+                for file_info in agent_view["available_files"]
+            )
         
         # Add memory navigation info
         memory_nav = agent_view.get("memory_navigation", {})
@@ -96,22 +596,28 @@ class BaseAgent:
             # Show clusters
             if memory_nav.get("memory_clusters"):
                 context_parts.append("Evidence Clusters:")
-                for cluster in memory_nav["memory_clusters"][:3]:  # Top 3 clusters
-                    contradiction_info = f" [⚠️ {len(cluster.contradiction_flags)} contradictions]" if cluster.contradiction_flags else ""
-                    unexplored_info = f" [🔍 {cluster.unexplored_count} unexplored]" if cluster.unexplored_count > 0 else ""
-                    context_parts.append(f"  • {cluster.theme}: {cluster.cluster_summary}{contradiction_info}{unexplored_info}")
+                context_parts.extend(
+                    f"  • {cluster.theme}: {cluster.cluster_summary}"
+                    f"{f' [⚠️ {len(cluster.contradiction_flags)} contradictions]' if cluster.contradiction_flags else ''}"
+                    f"{f' [🔍 {cluster.unexplored_count} unexplored]' if cluster.unexplored_count > 0 else ''}"
+                    for cluster in memory_nav["memory_clusters"][:3]  # Top 3 clusters
+                )
             
             # Show hot spots
             if memory_nav.get("hot_spots"):
                 context_parts.append("Investigation Hot Spots:")
-                for hot_spot in memory_nav["hot_spots"][:2]:  # Top 2 hot spots
-                    context_parts.append(f"  • {hot_spot['title']} ({hot_spot['connection_count']} connections)")
+                context_parts.extend(
+                    f"  • {hot_spot['title']} ({hot_spot['connection_count']} connections)"
+                    for hot_spot in memory_nav["hot_spots"][:2]  # Top 2 hot spots
+                )
             
             # Show navigation suggestions
             if memory_nav.get("navigation_suggestions"):
                 context_parts.append("Navigation Suggestions:")
-                for suggestion in memory_nav["navigation_suggestions"][:3]:  # Top 3 suggestions
-                    context_parts.append(f"  • {suggestion}")
+                context_parts.extend(
+                    f"  • {suggestion}"
+                    for suggestion in memory_nav["navigation_suggestions"][:3]  # Top 3 suggestions
+                )
         
         # Add task access info for relevant agents
         if agent_view.get("task_access", {}).get("access_level") == "full":
@@ -153,28 +659,52 @@ class BaseAgent:
         self.context_bank[key] = value
         self._log_execution("context_update", {"key": key, "value_length": len(value)})
     
+    async def _stream_json(self, prompt: str) -> Dict:
+        """Stream a Gemini response and parse the first balanced JSON object as soon as it arrives"""
+        if not hasattr(self.client, 'generate_content_stream_async'):
+            # Streaming unsupported - wait for the full response
+            response = await self.client.generate_content_async(contents=prompt)
+            return self._extract_json_from_response(response)
+        
+        scanner = JsonStreamScanner()
+        stream = self.client.generate_content_stream_async(contents=prompt)
+        try:
+            async for chunk in stream:
+                for candidate in scanner.feed(chunk):
+                    try:
+                        return loads_json(candidate)
+                    except json.JSONDecodeError:
+                        continue
+        finally:
+            await stream.aclose()
+        
+        return self._extract_json_from_response(scanner.text)
+    
     def _extract_json_from_response(self, response_text: str) -> Dict:
         """Extract JSON from Gemini response, handling various formats"""
         try:
             # First, try direct JSON parsing
-            return json.loads(response_text)
+            return loads_json(response_text)
         except json.JSONDecodeError:
             pass
         
-        # Try to find JSON within the response using regex
-        json_patterns = [
-            r'\{.*\}',  # Basic JSON object
-            r'```json\s*(\{.*?\})\s*```',  # JSON in code blocks
-            r'```\s*(\{.*?\})\s*```',  # JSON in generic code blocks
-        ]
+        # Scan for the first balanced object that parses
+        search_from = 0
+        while True:
+            span = find_json_span(response_text, search_from)
+            if span is None:
+                break
+            try:
+                return loads_json(response_text[span[0]:span[1]])
+            except json.JSONDecodeError:
+                search_from = span[0] + 1
         
-        for pattern in json_patterns:
-            matches = re.findall(pattern, response_text, re.DOTALL)
-            for match in matches:
-                try:
-                    return json.loads(match)
-                except json.JSONDecodeError:
-                    continue
+        # Fall back to JSON inside code fences
+        for match in JSON_FENCE_RE.finditer(response_text):
+            try:
+                return loads_json(match.group(1))
+            except json.JSONDecodeError:
+                continue
         
         # If no valid JSON found, create a fallback response
         logger.warning(f"Could not extract JSON from response: {response_text[:200]}...")
@@ -191,6 +721,7 @@ class PlannerAgent(BaseAgent):
         self.max_total_tasks = 8     # Reduced from 10 for efficiency
         self.synthesis_guidance = None
         self.conclusion_created = False  # Prevent multiple conclusions
+        self.request_semaphore = asyncio.Semaphore(3)  # Cap concurrent Gemini calls
         
     def _get_access_level(self) -> AgentAccessLevel:
         """Planner agents have PLANNER access level"""
@@ -202,47 +733,17 @@ class PlannerAgent(BaseAgent):
             # Get agent view for context
             agent_context = self._build_context(investigation_context)
             
-            planning_prompt = f"""
-            You are the Planner Agent creating an investigation plan for a CASE FILE ANALYSIS simulation.
-
-            CURRENT AGENT VIEW:
-            {agent_context}
-            
-            INVESTIGATION CONTEXT:
-            {investigation_context}
-            
-            🌳 STRATEGIC TASK CREATION FOR MINDMAP BUILDING:
-            - Maximum 5 initial tasks
-            - Create tasks that build LOGICAL HIERARCHY using similarity connections
-            - Focus on specific evidence categories identified in clusters above
-            - Each task should explore or connect to hot spots and unexplored areas
-            - Use navigation suggestions to guide task creation
-            - DO NOT create tasks asking for external information beyond available files
-            
-            Example good tasks based on your current view:
-            - "Deep dive into [specific cluster] evidence connections"
-            - "Explore contradictions in [specific cluster with flags]"
-            - "Analyze hot spot: [specific hot spot title]"
-            
-            Respond in JSON format:
-            {{
-                "tasks": [
-                    {{
-                        "description": "Case file analysis task description",
-                        "instructions": "Detailed instructions for analyzing available case data",
-                        "priority": "HIGH|MEDIUM|LOW"
-                    }}
-                ]
-            }}
-            """
+            planning_prompt = PLANNING_PROMPT_TEMPLATE.substitute(
+                agent_context=agent_context,
+                investigation_context=investigation_context
+            )
             
-            response = self.client.generate_content(contents=planning_prompt)
-            plan_result = self._extract_json_from_response(response)
+            plan_result = await self._stream_json(planning_prompt)
             
             if plan_result and 'tasks' in plan_result:
                 tasks = []
                 for task_data in plan_result['tasks'][:5]:  # Limit to 5 tasks
-                    priority = getattr(TaskPriority, task_data.get('priority', 'MEDIUM'))
+                    priority = TASK_PRIORITIES.get(task_data.get('priority', 'MEDIUM'), TaskPriority.MEDIUM)
                     task = Task(
                         description=task_data['description'],
                         instructions=task_data['instructions'],
@@ -250,27 +751,25 @@ class PlannerAgent(BaseAgent):
                     )
                     tasks.append(task)
                 
-                logger.info(f"[PLANNER] Created initial plan with {len(tasks)} tasks")
+                logger.info("[PLANNER] Created initial plan with %s tasks", len(tasks))
                 return tasks
             
         except Exception as e:
-            logger.error(f"[PLANNER] Error creating initial plan: {e}")
+            logger.error("[PLANNER] Error creating initial plan: %s", e)
         
         return []
     
     async def refine_plan(self, completed_task: Task, result: str, synthesis_guidance=None):
         """Refine plan based on completed task and synthesis guidance"""
+        await self.refine_many([(completed_task, result)], synthesis_guidance)
+    
+    async def refine_many(self, completed: List[Tuple[Task, str]], synthesis_guidance=None):
+        """Refine plan for several completed tasks, issuing the Gemini calls concurrently"""
         try:
             # IMMEDIATE CHECK: If conclusion already exists, don't create more tasks
             if self.conclusion_created:
                 logger.info("[PLANNER] 🛑 Conclusion already created - skipping plan refinement")
                 return
-                
-            # Check if conclusion node exists in memory tree
-            if self._conclusion_exists_in_tree():
-                logger.info("[PLANNER] 🛑 Conclusion node found in memory tree - stopping task generation")
-                self.conclusion_created = True
-                return
             
             # Store synthesis guidance
             if synthesis_guidance:
@@ -282,7 +781,7 @@ class PlannerAgent(BaseAgent):
             
             # ENHANCED STOPPING CONDITIONS  
             if total_tasks >= self.max_total_tasks:
-                logger.info(f"[PLANNER] 🛑 Reached maximum tasks ({self.max_total_tasks})")
+                logger.info("[PLANNER] 🛑 Reached maximum tasks (%s)", self.max_total_tasks)
                 if not self.conclusion_created:
                     await self._create_conclusion_task("Maximum task limit reached")
                     self.conclusion_created = True
@@ -302,7 +801,7 @@ class PlannerAgent(BaseAgent):
                 confidence = self.synthesis_guidance.get('confidence_level', 0)
                 
                 if recommendation == 'CONCLUDE' or confidence >= 0.8:
-                    logger.info(f"[PLANNER] 🎯 Synthesis recommends conclusion (confidence: {confidence:.2f})")
+                    logger.info("[PLANNER] 🎯 Synthesis recommends conclusion (confidence: %.2f)", confidence)
                     if not self.conclusion_created:
                         await self._create_conclusion_task(f"High confidence reached: {confidence:.2f}")
                         self.conclusion_created = True
@@ -310,7 +809,7 @@ class PlannerAgent(BaseAgent):
                 
                 # IMPROVED: Stop earlier with medium confidence and sufficient tasks
                 if total_tasks >= 6 and confidence >= 0.65 and recommendation == 'FOCUS':
-                    logger.info(f"[PLANNER] 📋 Sufficient investigation completed ({total_tasks} tasks, confidence: {confidence:.2f})")
+                    logger.info("[PLANNER] 📋 Sufficient investigation completed (%s tasks, confidence: %.2f)", total_tasks, confidence)
                     if not self.conclusion_created:
                         await self._create_conclusion_task("Sufficient evidence gathered for conclusion")
                         self.conclusion_created = True
@@ -318,197 +817,193 @@ class PlannerAgent(BaseAgent):
                 
                 if recommendation == 'FOCUS':
                     focus_area = self.synthesis_guidance.get('priority_focus', '')
-                    logger.info(f"[PLANNER] 🎯 Focusing on: {focus_area}")
+                    logger.info("[PLANNER] 🎯 Focusing on: %s", focus_area)
             
             tree_stats = self.memory_tree.get_tree_statistics()
+            guidance_text = self._format_synthesis_guidance()
             
-            # ENHANCED: Create deeper evidence chains instead of broad analysis
-            refinement_prompt = f"""
-            You are the Planner Agent refining the investigation plan with DEPTH-FOCUSED approach.
-            
-            COMPLETED TASK: {completed_task.description}
-            RESULT: {result[:500]}...
-            
-            CURRENT STATE:
-            - Memory tree: {tree_stats['total_nodes']} nodes, depth {tree_stats['max_depth']}
-            - Total completed tasks: {total_tasks}
-            
-            SYNTHESIS GUIDANCE:
-            {self.synthesis_guidance if self.synthesis_guidance else "No synthesis guidance available"}
-            
-            🌳 AGGRESSIVE DEPTH-FORCING REFINEMENT:
-            - FORCE DEEP HIERARCHY: Only create tasks that extend leaf nodes or shallow branches
-            - MANDATORY DEPTH EXTENSION: Every task MUST target a specific existing node for deepening
-            - ZERO BREADTH TOLERANCE: No new top-level categories, only sub-analysis of existing nodes
-            - DEPTH REQUIREMENT: Tasks must create at least 2-3 levels of sub-analysis
-            - Maximum {self.max_tasks_per_cycle} DEPTH-FOCUSED tasks per refinement
-            - AGGRESSIVE TARGETING: Identify the shallowest analysis nodes and force deeper exploration
-            
-            Aggressive Depth Strategy:
-            1. If confidence < 0.7: Force deep dive into weakest evidence branches (3+ levels)
-            2. If confidence 0.7-0.8: Create sub-sub-analysis that connects evidence chains deeply
-            3. If confidence > 0.8: Create nested conclusion hierarchies summarizing evidence trees
-            
-            Should you create new tasks? Consider:
-            1. Do we have sufficient evidence depth on key points?
-            2. Are there critical logical gaps in the evidence chain?
-            3. Can we connect existing evidence more strongly?
-            
-            Respond in JSON format:
-            {{
-                "should_continue": true/false,
-                "reasoning": "why continue or stop",
-                "evidence_focus": "what evidence needs strengthening",
-                "new_tasks": [
-                    {{
-                        "description": "specific evidence task",
-                        "instructions": "detailed analysis instructions", 
-                        "priority": "HIGH|MEDIUM|LOW",
-                        "builds_on": "which existing node this extends"
-                    }}
-                ]
-            }}
-            """
-            
-            response = self.client.generate_content(contents=refinement_prompt)
-            refinement_result = self._extract_json_from_response(response)
+            prompts = [
+                self._build_refinement_prompt(completed_task, result, tree_stats, total_tasks, guidance_text)
+                for completed_task, result in completed
+            ]
+            refinement_results = await asyncio.gather(*(self._generate_bounded(prompt) for prompt in prompts))
             
-            if refinement_result:
-                should_continue = refinement_result.get('should_continue', True)
-                reasoning = refinement_result.get('reasoning', 'No reasoning provided')
-                evidence_focus = refinement_result.get('evidence_focus', 'General analysis')
-                
-                logger.info(f"[PLANNER] Refinement decision: {'CONTINUE' if should_continue else 'STOP'}")
-                logger.info(f"[PLANNER] Evidence focus: {evidence_focus}")
-                logger.info(f"[PLANNER] Reasoning: {reasoning}")
+            # Re-check the task cap before each refinement, as serial refine_plan calls did, and share
+            # one per-cycle budget across the batch so concurrent refinements can't queue more
+            task_budget = self.max_tasks_per_cycle
+            for refinement_result in refinement_results:
+                if self.conclusion_created:
+                    break
                 
-                if should_continue and 'new_tasks' in refinement_result:
-                    new_tasks = refinement_result['new_tasks'][:self.max_tasks_per_cycle]
-                    
-                    # Enhanced task filtering for depth over breadth
-                    filtered_tasks = self._filter_for_depth_and_quality(new_tasks)
-                    
-                    for task_data in filtered_tasks:
-                        priority = getattr(TaskPriority, task_data.get('priority', 'MEDIUM'))
-                        task = Task(
-                            description=task_data['description'],
-                            instructions=task_data['instructions'],
-                            priority=priority
-                        )
-                        self.task_queue.add_task(task)
-                    
-                    if filtered_tasks:
-                        logger.info(f"[PLANNER] Added {len(filtered_tasks)} depth-focused tasks")
-                    else:
-                        logger.info("[PLANNER] 🚫 All proposed tasks filtered - concluding")
-                        if not self.conclusion_created:
-                            await self._create_conclusion_task("No new productive tasks identified")
-                            self.conclusion_created = True
-            else:
-                logger.info("[PLANNER] 🏁 No new tasks - investigation complete")
-                if not self.conclusion_created:
-                    await self._create_conclusion_task("Investigation analysis complete")
+                queue_stats = self.task_queue.get_queue_statistics()
+                total_tasks = queue_stats['completed_tasks'] + queue_stats['failed_tasks']
+                if total_tasks >= self.max_total_tasks:
+                    logger.info("[PLANNER] 🛑 Reached maximum tasks (%s)", self.max_total_tasks)
+                    await self._create_conclusion_task("Maximum task limit reached")
                     self.conclusion_created = True
+                    break
+                
+                # Applied even once the budget is spent, so an empty or all-filtered response still concludes
+                task_budget -= await self._apply_refinement(refinement_result, task_budget)
             
         except Exception as e:
-            logger.error(f"[PLANNER] Error refining plan: {e}")
+            logger.error("[PLANNER] Error refining plan: %s", e)
+    
+    async def _generate_bounded(self, prompt: str) -> Dict:
+        """Call Gemini asynchronously, capping concurrent requests to respect rate limits"""
+        async with self.request_semaphore:
+            return await self._stream_json(prompt)
+    
+    def _format_synthesis_guidance(self, width: int = 1000) -> str:
+        """Serialize synthesis guidance compactly for the refinement prompt"""
+        if not self.synthesis_guidance:
+            return "No synthesis guidance available"
+        return preview_text(dumps_json_compact(self.synthesis_guidance), width)
+    
+    def _build_refinement_prompt(self, completed_task: Task, result: str, tree_stats: Dict[str, Any], total_tasks: int, guidance_text: str) -> str:
+        """Build the refinement prompt for a single completed task"""
+        result_preview = preview_text(result)
+        
+        # ENHANCED: Create deeper evidence chains instead of broad analysis
+        return REFINEMENT_PROMPT_TEMPLATE.substitute(
+            task_description=completed_task.description,
+            result_preview=result_preview,
+            total_nodes=tree_stats['total_nodes'],
+            max_depth=tree_stats['max_depth'],
+            total_tasks=total_tasks,
+            guidance_text=guidance_text,
+            max_tasks_per_cycle=self.max_tasks_per_cycle
+        )
+    
+    async def _apply_refinement(self, refinement_result: Dict, task_budget: int) -> int:
+        """Queue up to task_budget tasks proposed by a refinement response, or conclude; returns the number queued"""
+        queued = 0
+        if refinement_result:
+            should_continue = refinement_result.get('should_continue', True)
+            reasoning = refinement_result.get('reasoning', 'No reasoning provided')
+            evidence_focus = refinement_result.get('evidence_focus', 'General analysis')
+            
+            logger.info("[PLANNER] Refinement decision: %s", 'CONTINUE' if should_continue else 'STOP')
+            logger.info("[PLANNER] Evidence focus: %s", evidence_focus)
+            logger.info("[PLANNER] Reasoning: %s", reasoning)
+            
+            if should_continue and 'new_tasks' in refinement_result:
+                new_tasks = refinement_result['new_tasks'][:self.max_tasks_per_cycle]
+                
+                # Enhanced task filtering for depth over breadth
+                filtered_tasks = self._filter_for_depth_and_quality(new_tasks)
+                
+                queued_tasks = filtered_tasks[:task_budget]
+                self.task_queue.add_tasks([
+                    Task(
+                        description=task_data['description'],
+                        instructions=task_data['instructions'],
+                        priority=TASK_PRIORITIES.get(task_data.get('priority', 'MEDIUM'), TaskPriority.MEDIUM)
+                    )
+                    for task_data in queued_tasks
+                ])
+                queued = len(queued_tasks)
+                
+                if queued:
+                    logger.info("[PLANNER] Added %s depth-focused tasks", queued)
+                elif filtered_tasks:
+                    logger.info("[PLANNER] 🛑 Task budget for this cycle reached - not queuing %s tasks", len(filtered_tasks))
+                else:
+                    logger.info("[PLANNER] 🚫 All proposed tasks filtered - concluding")
+                    if not self.conclusion_created:
+                        await self._create_conclusion_task("No new productive tasks identified")
+                        self.conclusion_created = True
+        else:
+            logger.info("[PLANNER] 🏁 No new tasks - investigation complete")
+            if not self.conclusion_created:
+                await self._create_conclusion_task("Investigation analysis complete")
+                self.conclusion_created = True
+        
+        return queued
 
     def _detect_task_loops(self, recent_tasks):
         """Detect if we're in a repetitive task loop"""
         if len(recent_tasks) < 6:
             return False
         
-        # Look for repeated keywords in recent tasks
-        keywords = []
+        # Bucket each recent task by its first matching loop keyword
+        bucket_counts = Counter()
         for task in recent_tasks:
             desc = task.description.lower()
-            if 'afis' in desc or 'fingerprint' in desc:
-                keywords.append('fingerprint')
-            elif 'alibi' in desc or 'verify' in desc:
-                keywords.append('alibi')
-            elif 'fabric' in desc:
-                keywords.append('fabric')
-            elif 'interview' in desc:
-                keywords.append('interview')
+            bucket = next((bucket for keyword, bucket in LOOP_KEYWORD_BUCKETS.items() if keyword in desc), None)
+            if bucket:
+                bucket_counts[bucket] += 1
         
         # If more than 4 of the last 6 tasks are the same type, we're looping
-        if len(keywords) >= 4:
-            most_common = max(set(keywords), key=keywords.count)
-            if keywords.count(most_common) >= 4:
-                logger.info(f"[PLANNER] 🔄 Detected loop: {keywords.count(most_common)} '{most_common}' tasks in recent history")
+        if bucket_counts:
+            most_common, count = bucket_counts.most_common(1)[0]
+            if count >= 4:
+                logger.info("[PLANNER] 🔄 Detected loop: %s '%s' tasks in recent history", count, most_common)
                 return True
         
         return False
 
-    def _conclusion_exists_in_tree(self) -> bool:
-        """Check if a conclusion has already been generated"""
-        try:
-            # Check if conclusion exists in context bank instead of tree
-            return "final_conclusion" in self.context_bank or self.conclusion_created
-            
-        except Exception as e:
-            logger.error(f"[PLANNER] Error checking for conclusion: {e}")
-            return False
+    def _update_context_bank(self, key: str, value: str):
+        """Update the context bank, flagging the conclusion as soon as it is stored"""
+        super()._update_context_bank(key, value)
+        self.conclusion_created |= (key == "final_conclusion")
 
     def _filter_for_depth_and_quality(self, new_tasks):
         """AGGRESSIVE filtering for maximum depth, zero tolerance for shallow tasks"""
         recent_tasks = self.task_queue.get_recent_completed_tasks(5)
+        # Precompute token sets and keyword hits for recent tasks once
         recent_descriptions = [task.description.lower() for task in recent_tasks]
+        recent_sets = [description_tokens(recent_desc) for recent_desc in recent_descriptions]
+        recent_keywords = [frozenset(REPETITION_KEYWORD_RE.findall(recent_desc))
+                           for recent_desc in recent_descriptions]
         
+        # Each description is lowercased once and reused by every check below
         filtered = []
         for task in new_tasks:
             desc = task['description'].lower()
+            desc_set = description_tokens(desc)
+            desc_keywords = frozenset(REPETITION_KEYWORD_RE.findall(desc))
             
             # AGGRESSIVE filtering: zero tolerance for shallow tasks
             is_repetitive = False
             is_shallow = False
             lacks_depth_target = False
             
-            # Check for repetition
-            for recent_desc in recent_descriptions:
-                if any(keyword in desc and keyword in recent_desc for keyword in 
-                      ['afis', 'alibi', 'fingerprint', 'verify', 'analyze', 'investigate']):
-                    similarity_score = len(set(desc.split()) & set(recent_desc.split())) / len(set(desc.split()) | set(recent_desc.split()))
-                    if similarity_score > 0.3:  # Lowered from 0.4 - be more strict
+            # Check for repetition (Jaccard only when both share a keyword)
+            if desc_keywords:
+                for recent_set, keywords in zip(recent_sets, recent_keywords):
+                    if desc_keywords.isdisjoint(keywords):
+                        continue
+                    # Jaccard can't exceed the size ratio, so skip pairs that can never match
+                    shorter, longer = sorted((len(desc_set), len(recent_set)))
+                    if shorter <= REPETITION_THRESHOLD * longer:
+                        continue
+                    similarity_score = jaccard_similarity(desc_set, recent_set)
+                    if similarity_score > REPETITION_THRESHOLD:
                         is_repetitive = True
                         break
             
-            # IMPROVED shallow detection - only truly shallow terms
-            shallow_indicators = [
-                'general overview', 'broad analysis', 'comprehensive review',
-                'overall assessment', 'complete investigation', 'full examination'
-            ]
             # Check for actual shallow phrases, not individual investigative words
-            is_shallow = any(indicator in desc for indicator in shallow_indicators)
+            is_shallow = SHALLOW_INDICATOR_RE.search(desc) is not None
             
             # Check if task targets specific existing nodes (depth requirement)
-            depth_requirement_indicators = [
-                'specific', 'detailed', 'sub-analysis', 'deeper', 'granular',
-                'cross-reference', 'correlate', 'connect', 'extend', 'build on',
-                'analyze', 'examine', 'investigate', 'review'  # Allow core investigative terms
-            ]
-            has_depth_target = any(indicator in desc for indicator in depth_requirement_indicators)
+            has_depth_target = DEPTH_INDICATOR_RE.search(desc) is not None
             
             # Check if task mentions building on existing analysis
             builds_on_existing = 'builds_on' in task and task['builds_on']
             
             # RELAXED: Allow tasks with depth indicators OR specific content OR being early in investigation
             if not is_repetitive and not is_shallow and (has_depth_target or builds_on_existing or len(recent_tasks) < 3):
-                filtered.append(task)
+                filtered.append((task, desc))
             else:
                 reason = "repetitive" if is_repetitive else "shallow/lacks depth target" if is_shallow else "no depth indicators"
-                logger.info(f"[PLANNER] 🚫 Filter: {reason} task: {task['description']}")
+                logger.info("[PLANNER] 🚫 Filter: %s task: %s", reason, task['description'])
         
         # Additional aggressive filtering: prefer tasks that mention specific node types
         depth_priority_filtered = []
-        for task in filtered:
-            desc = task['description'].lower()
+        for task, desc in filtered:
             # Prioritize tasks that mention specific evidence types or analysis areas
-            priority_indicators = [
-                'fingerprint analysis', 'fabric analysis', 'timeline correlation',
-                'motive analysis', 'appointment details', 'witness statement cross-reference'
-            ]
-            if any(indicator in desc for indicator in priority_indicators):
+            if PRIORITY_INDICATOR_RE.search(desc):
                 depth_priority_filtered.insert(0, task)  # Add to front
             else:
                 depth_priority_filtered.append(task)
@@ -517,7 +1012,7 @@ class PlannerAgent(BaseAgent):
 
     async def _create_conclusion_task(self, reason):
         """Create and immediately execute a final conclusion task"""
-        logger.info(f"[PLANNER] 🏁 Forcing immediate conclusion: {reason}")
+        logger.info("[PLANNER] 🏁 Forcing immediate conclusion: %s", reason)
         
         # Check if conclusion task already exists in queue
         if self.task_queue.has_conclusion_task():
@@ -576,7 +1071,7 @@ class PlannerAgent(BaseAgent):
             logger.info("[PLANNER] ✅ Investigation conclusion generated (not added to tree)")
             
         except Exception as e:
-            logger.error(f"[PLANNER] ❌ Error creating forced conclusion: {e}")
+            logger.error("[PLANNER] ❌ Error creating forced conclusion: %s", e)
             # Fallback to queued task if direct creation fails
             conclusion_task = Task(
                 description="Final Investigation Conclusion",
@@ -654,8 +1149,8 @@ class ExecutorAgent(BaseAgent):
         """
         
         try:
-            response = self.client.generate_content(contents=prompt)
-            response_text = response if isinstance(response, str) else str(response)
+            response = await self.client.generate_content_async(contents=prompt)
+            response_text = response_to_text(response)
             
             logger.info(f"Executor response: {response_text[:300]}...")
             
@@ -698,15 +1193,15 @@ class ExecutorAgent(BaseAgent):
         # Extract keywords from task for focused context
         task_keywords = task.description.lower()
         
-        # Get agent view with task context
-        agent_context = self._build_context(task_keywords)
+        # Get agent view with task context once and reuse it for both sections
+        memory_view = self._get_memory_view(query_context=task_keywords)
+        agent_context = self._build_context_from_view(memory_view)
         
         context_parts = ["EXECUTOR AGENT - SIMILARITY-BASED CONTEXT:"]
         context_parts.append("=" * 50)
         context_parts.append(agent_context)
         
         # Get memory navigation focused on task
-        memory_view = self._get_memory_view(query_context=task_keywords)
         memory_nav = memory_view.get("memory_navigation", {})
         
         # Add focused node summaries if available
@@ -729,7 +1224,11 @@ class ExecutorAgent(BaseAgent):
         """Parse execution response into ExecutionResult"""
         success = execution_data.get("success", True)
         detailed_results = execution_data.get("detailed_results", "")
-        memory_updates = execution_data.get("memory_updates", [])
+        memory_updates = [
+            MemoryUpdate.from_dict(update)
+            for update in execution_data.get("memory_updates", [])
+            if isinstance(update, dict)
+        ]
         
         return ExecutionResult(
             success=success,
@@ -742,76 +1241,74 @@ class ExecutorAgent(BaseAgent):
         if not result.memory_updates:
             return
         
-        for update in result.memory_updates:
-            try:
-                action = update.get("action")
-                
-                if action == "ADD_NODE":
-                    node = MemoryNode(
-                        name=update.get("node_name", "Analysis Result"),
-                        description=update.get("description", "Analysis finding")
-                    )
+        # Parent resolution logs several records per node - flush them together
+        with self._batched_logging():
+            for update in result.memory_updates:
+                try:
+                    if update.action == "ADD_NODE":
+                        node = MemoryNode(
+                            name=update.node_name or "Analysis Result",
+                            description=update.description or "Analysis finding"
+                        )
                     
-                    # Mark node as completed since it represents a successful task result
-                    node.status = NodeStatus.COMPLETED if result.success else NodeStatus.FAILED
+                        # Mark node as completed since it represents a successful task result
+                        node.status = NodeStatus.COMPLETED if result.success else NodeStatus.FAILED
                     
-                    # IMPROVED: Handle parent node ID with better resolution strategy
-                    parent_id = update.get("parent_node_id")
-                    if parent_id:
-                        # Try exact ID match first
-                        if parent_id in self.memory_tree.nodes:
-                            self._log_execution("parent_node_exact_match", {
-                                "node_id": parent_id,
-                                "node_name": self.memory_tree.nodes[parent_id].name
-                            })
-                        # Try partial ID match (first 8 chars)
-                        elif len(parent_id) >= 8:
-                            matching_ids = [
-                                node_id for node_id in self.memory_tree.nodes.keys()
-                                if node_id.startswith(parent_id[:8])
-                            ]
-                            if matching_ids:
-                                parent_id = matching_ids[0]
-                                self._log_execution("parent_node_partial_id_resolved", {
-                                    "requested": update.get("parent_node_id"),
-                                    "resolved_to": parent_id
-                                })
-                            else:
-                                parent_id = self._find_best_parent_by_content(node, update.get("parent_node_id"))
-                        # Try to find node by name/content similarity
-                        else:
-                            parent_id = self._find_best_parent_by_content(node, update.get("parent_node_id"))
-                    else:
-                        # Smart parent selection when no parent specified
-                        parent_id = self._find_best_parent_by_content(node, None)
+                        parent_id = self._resolve_parent_id(update, node)
                     
-                    node_id = self.memory_tree.add_node(node, parent_id)
+                        node_id = self.memory_tree.add_node(node, parent_id)
                     
-                    self._log_execution("memory_node_added", {
-                        "node_id": node_id,
-                        "node_name": node.name,
-                        "parent_id": parent_id
-                    })
+                        self._log_execution("memory_node_added", {
+                            "node_id": node_id,
+                            "node_name": node.name,
+                            "parent_id": parent_id
+                        })
                 
-                elif action == "UPDATE_NODE":
-                    node_id = update.get("node_id")
-                    description = update.get("description")
-                    
-                    if node_id:
-                        success = self.memory_tree.update_node(
-                            node_id, 
-                            description=description,
-                            status=NodeStatus.COMPLETED
-                        )
+                    elif update.action == "UPDATE_NODE":
+                        if update.node_id:
+                            success = self.memory_tree.update_node(
+                                update.node_id, 
+                                description=update.description,
+                                status=NodeStatus.COMPLETED
+                            )
                         
-                        if success:
-                            self._log_execution("memory_node_updated", {
-                                "node_id": node_id,
-                                "new_description": description
-                            })
+                            if success:
+                                self._log_execution("memory_node_updated", {
+                                    "node_id": update.node_id,
+                                    "new_description": update.description
+                                })
                 
-            except Exception as e:
-                logger.error(f"Error committing memory update: {e}")
+                except Exception as e:
+                    logger.error(f"Error committing memory update: {e}")
+    
+    def _resolve_parent_id(self, update: MemoryUpdate, node: MemoryNode) -> str:
+        """Resolve the requested parent: exact ID, then ID prefix, then name, then smart selection"""
+        requested = update.parent_node_id
+        if not requested:
+            # Smart parent selection when no parent specified
+            return self._find_best_parent_by_content(node, None)
+        
+        # Exact ID match - the common case, skips all scoring
+        exact_node = self.memory_tree.nodes.get(requested)
+        if exact_node is not None:
+            self._log_execution("parent_node_exact_match", {
+                "node_id": requested,
+                "node_name": exact_node.name
+            })
+            return requested
+        
+        # Partial ID match (first 8 chars)
+        if len(requested) >= 8:
+            matching_id = self._resolve_partial_id(requested[:8])
+            if matching_id:
+                self._log_execution("parent_node_partial_id_resolved", {
+                    "requested": requested,
+                    "resolved_to": matching_id
+                })
+                return matching_id
+        
+        # Find node by name/content similarity
+        return self._find_best_parent_by_content(node, requested)
     
     def _find_best_parent_by_content(self, new_node: MemoryNode, requested_parent: str = None) -> str:
         """Find the best parent node based on content similarity and logical hierarchy"""
@@ -820,12 +1317,8 @@ class ExecutorAgent(BaseAgent):
         
         # If a specific parent was requested, try to find it by name
         if requested_parent:
-            name_matches = [
-                node_id for node_id, node in self.memory_tree.nodes.items()
-                if requested_parent.lower() in node.name.lower() or node.name.lower() in requested_parent.lower()
-            ]
-            if name_matches:
-                best_match = name_matches[0]
+            best_match = self._resolve_parent_by_name(requested_parent)
+            if best_match:
                 self._log_execution("parent_node_name_resolved", {
                     "requested": requested_parent,
                     "resolved_to": best_match,
@@ -834,68 +1327,74 @@ class ExecutorAgent(BaseAgent):
                 return best_match
         
         # AGGRESSIVE DEPTH-FIRST parent selection
-        new_node_lower = new_node.name.lower() + " " + new_node.description.lower()
+        new_node_lower = new_node.content_lower
         
         # Categorize new node
-        is_evidence = any(word in new_node_lower for word in ['evidence', 'forensic', 'fingerprint', 'weapon', 'fabric', 'soil'])
-        is_suspect = any(word in new_node_lower for word in ['hartwell', 'robert', 'suspect', 'motive'])
-        is_timeline = any(word in new_node_lower for word in ['timeline', 'appointment', 'time', 'alibi'])
-        is_analysis = any(word in new_node_lower for word in ['analysis', 'conclusion', 'synthesis'])
+        category_rules = [
+            rule for rule in NODE_CATEGORY_RULES
+            if rule[1].search(new_node_lower) is not None
+        ]
         
         # Find best matching parent by category and content with AGGRESSIVE DEPTH PREFERENCE
         best_parent = None
         best_score = 0
         
+        # Hoist per-call work out of the candidate loop: only the categories the
+        # new node belongs to are checked, in priority order
+        category_checks = [(1 << category, bonus) for category, _, _, bonus in category_rules]
+        new_tokens = new_node.content_tokens
+        new_token_bits = new_node.content_token_bits
+        root_id = self.memory_tree.root_id
+        max_category_bonus = max((bonus for _, bonus in category_checks), default=0)
+        # No candidate can score above this, so stop once it is reached
+        max_possible_score = PARENT_DEPTH_BONUS[-1] + 3 + max_category_bonus + len(new_tokens) * 2
+        
         for node_id, node in self.memory_tree.nodes.items():
-            if node_id == self.memory_tree.root_id:
+            if node_id == root_id:
                 continue  # NEVER use root as parent unless absolutely no other choice
             
-            node_lower = node.name.lower() + " " + node.description.lower()
-            score = 0
-            
-            # AGGRESSIVE: Category matching with higher scores
-            if is_evidence and any(word in node_lower for word in ['evidence', 'forensic', 'investigation']):
-                score += 5  # Increased from 3
-            elif is_suspect and any(word in node_lower for word in ['hartwell', 'robert', 'suspect', 'motive']):
-                score += 5  # Increased from 3
-            elif is_timeline and any(word in node_lower for word in ['timeline', 'appointment', 'time']):
-                score += 5  # Increased from 3
-            elif is_analysis and any(word in node_lower for word in ['analysis', 'synthesis']):
-                score += 4  # Increased from 2
-            
-            # Content similarity with higher weight
-            shared_words = set(new_node_lower.split()) & set(node_lower.split())
-            score += len([w for w in shared_words if len(w) > 3]) * 2  # Double weight
-            
             # AGGRESSIVE DEPTH PREFERENCE: Heavily prefer deeper nodes
-            node_depth = self._get_node_depth(node_id)
-            if node_depth >= 2:
-                score += 10  # HUGE bonus for depth 2+
-            elif node_depth >= 1:
-                score += 5   # Good bonus for depth 1
-            else:
-                score -= 5   # Penalty for shallow nodes
+            score = PARENT_DEPTH_BONUS[min(node.depth, 2)]
             
-            # Extra bonus for leaf nodes (they need children)
-            if self._is_leaf_node(node_id):
+            # Extra bonus for leaf nodes (they need children), penalty for nodes
+            # that already have many children (encourage balanced growth)
+            child_count = len(node.children_ids)
+            if child_count == 0:
                 score += 3
-            
-            # Penalty for nodes that already have many children (encourage balanced growth)
-            child_count = len([n for n in self.memory_tree.nodes.values() if n.parent_id == node_id])
-            if child_count >= 3:
+            elif child_count >= 3:
                 score -= 2
             
+            # Skip the text checks when even a full category and content match
+            # couldn't beat the current best (ties keep the earlier node)
+            content_bound = min(len(new_tokens), len(node.content_tokens)) * 2
+            if score + max_category_bonus + content_bound <= best_score:
+                continue
+            
+            # AGGRESSIVE: Category matching with higher scores
+            if category_checks:
+                parent_mask = node.content_derived(parent_category_mask)
+                score += next((bonus for bit, bonus in category_checks if parent_mask & bit), 0)
+            
+            # Content similarity with higher weight; disjoint fingerprints mean
+            # no shared tokens, so the set intersection can be skipped
+            if new_token_bits & node.content_token_bits:
+                score += len(new_tokens & node.content_tokens) * 2  # Double weight
+            
             if score > best_score:
                 best_score = score
                 best_parent = node_id
+                if best_score >= max_possible_score:
+                    break
         
         # AGGRESSIVE: Only use root as absolute last resort and with high penalty
         if best_score < 3:  # Increased threshold from 2
-            # Try to find ANY non-root node rather than defaulting to root
-            non_root_nodes = [nid for nid in self.memory_tree.nodes.keys() if nid != self.memory_tree.root_id]
-            if non_root_nodes:
-                # Pick the deepest available node
-                deepest_node = max(non_root_nodes, key=self._get_node_depth)
+            # Try to find ANY non-root node rather than defaulting to root - pick the deepest
+            deepest_node = self.memory_tree.get_deepest_node()
+            if deepest_node and self.memory_tree.nodes[deepest_node].depth > MAX_COUNTED_DEPTH:
+                # Depths past the cap tie, so the first node reaching it wins
+                deepest_node = next(node_id for node_id, node in self.memory_tree.nodes.items()
+                                    if node_id != self.memory_tree.root_id and node.depth >= MAX_COUNTED_DEPTH)
+            if deepest_node:
                 best_parent = deepest_node
                 self._log_execution("parent_forced_depth", {
                     "forced_parent": deepest_node,
@@ -910,36 +1409,40 @@ class ExecutorAgent(BaseAgent):
                 "selected": best_parent,
                 "selected_name": self.memory_tree.nodes[best_parent].name if best_parent in self.memory_tree.nodes else "root",
                 "score": best_score,
-                "new_node_category": "evidence" if is_evidence else "suspect" if is_suspect else "timeline" if is_timeline else "analysis" if is_analysis else "other"
+                "new_node_category": (category_rules[0][0] if category_rules else NodeCategory.OTHER).name.lower()
             })
         
         return best_parent
     
-    def _get_node_depth(self, node_id: str) -> int:
-        """Get the depth of a node in the tree"""
-        if not node_id or node_id not in self.memory_tree.nodes:
-            return 0
-        
-        depth = 0
-        current_id = node_id
-        visited = set()
-        
-        while current_id and current_id != self.memory_tree.root_id and current_id not in visited:
-            visited.add(current_id)
-            node = self.memory_tree.nodes.get(current_id)
-            if not node or not node.parent_id:
-                break
-            current_id = node.parent_id
-            depth += 1
-            
-            if depth > 10:  # Prevent infinite loops
-                break
+    def _resolve_partial_id(self, id_prefix: str) -> Optional[str]:
+        """Return the first node ID starting with the given prefix"""
+        return self.memory_tree.find_node_by_id_prefix(id_prefix)
+    
+    def _resolve_parent_by_name(self, requested_parent: str) -> Optional[str]:
+        """Return the first node in tree order whose name contains, or is contained in, the requested name, preferring whole-word matches"""
+        requested_lower = requested_parent.lower()
         
-        return depth
+        # Nodes sharing a whole word with the request are the likely matches
+        for node_id in self.memory_tree.find_nodes_sharing_name_words(requested_lower):
+            name_lower = self.memory_tree.nodes[node_id].name_lower
+            if requested_lower in name_lower or name_lower in requested_lower:
+                return node_id
+        
+        # Fall back to a full scan for partial-word matches
+        for node_id, node in self.memory_tree.nodes.items():
+            if requested_lower in node.name_lower or node.name_lower in requested_lower:
+                return node_id
+        return None
+    
+    def _get_node_depth(self, node_id: str) -> int:
+        """Get the depth of a node in the tree, counted up to MAX_COUNTED_DEPTH"""
+        node = self.memory_tree.nodes.get(node_id) if node_id else None
+        return min(node.depth, MAX_COUNTED_DEPTH) if node else 0
     
     def _is_leaf_node(self, node_id: str) -> bool:
         """Check if a node is a leaf (has no children)"""
-        return not any(node.parent_id == node_id for node in self.memory_tree.nodes.values())
+        node = self.memory_tree.nodes.get(node_id)
+        return not node or not node.children_ids
 
 
 class SynthesisAgent(BaseAgent):
@@ -949,10 +1452,11 @@ class SynthesisAgent(BaseAgent):
         super().__init__("SynthesisAgent", gemini_client, memory_tree, view_controller)
         self.task_queue = task_queue
         self.analysis_interval = 30  # seconds
-        self.last_analysis_time = 0
+        self.last_analysis_time = 0.0
         self.analysis_count = 0
         self.confidence_threshold = 0.8  # Stop when confidence is high enough
         self.is_running = False
+        self._stop_event: Optional[asyncio.Event] = None
     
     def _get_access_level(self) -> AgentAccessLevel:
         """Synthesis agents have SYNTHESIZER access level"""
@@ -961,30 +1465,34 @@ class SynthesisAgent(BaseAgent):
     async def continuous_analysis(self):
         """Run continuous background analysis"""
         self.is_running = True
+        self._stop_event = asyncio.Event()
         while self.is_running:
             try:
-                current_time = time.time()
+                await self.perform_synthesis()
+                self.last_analysis_time = time.monotonic()
+                self.analysis_count += 1
                 
-                # Check if it's time for analysis
-                if current_time - self.last_analysis_time >= self.analysis_interval:
-                    await self.perform_synthesis()
-                    self.last_analysis_time = current_time
-                    self.analysis_count += 1
-                
-                await asyncio.sleep(5)  # Check every 5 seconds
+                # Sleep until the next analysis is due, waking early only to stop
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=self.analysis_interval)
                 
             except Exception as e:
                 logger.error(f"[SYNTHESIS] Error in continuous analysis: {e}")
                 await asyncio.sleep(10)
     
+    def stop_analysis(self):
+        """Stop continuous analysis, waking the loop if it is waiting"""
+        self.is_running = False
+        if self._stop_event is not None:
+            self._stop_event.set()
+    
     async def perform_synthesis(self):
         """Perform synthesis analysis using view controller insights"""
         try:
             # Get comprehensive view using view controller
-            agent_context = self._build_context("synthesis analysis")
-            memory_view = self._get_memory_view(query_context="overall investigation status")
+            memory_view = self._get_memory_view(query_context="synthesis analysis")
+            agent_context = self._build_context_from_view(memory_view) if memory_view else self._build_context()
             
-            tree_stats = self.memory_tree.get_tree_statistics()
             queue_stats = self.task_queue.get_queue_statistics()
             
             # Get memory navigation insights
@@ -994,70 +1502,30 @@ class SynthesisAgent(BaseAgent):
             
             total_tasks = queue_stats['completed_tasks'] + queue_stats['failed_tasks']
             
-            # Calculate cluster-based metrics
-            cluster_completeness = 0
-            contradiction_count = 0
-            unexplored_count = 0
-            
-            for cluster in clusters:
-                if cluster.unexplored_count == 0:
-                    cluster_completeness += 1
-                contradiction_count += len(cluster.contradiction_flags)
-                unexplored_count += cluster.unexplored_count
+            # Cluster-based metrics, aggregated by the view controller
+            cluster_stats = memory_nav.get("cluster_stats") or ClusterStats()
+            cluster_completeness = cluster_stats.complete_clusters
+            contradiction_count = cluster_stats.contradiction_count
+            unexplored_count = cluster_stats.unexplored_count
             
             cluster_completion_rate = cluster_completeness / max(len(clusters), 1)
             
-            synthesis_prompt = f"""
-            You are the Synthesis Agent conducting ENHANCED strategic analysis using similarity-based insights.
-            
-            CURRENT INVESTIGATION STATE:
-            {agent_context}
-            
-            SIMILARITY-BASED ANALYSIS:
-            - Evidence clusters: {len(clusters)} total
-            - Cluster completion rate: {cluster_completion_rate:.2f} ({cluster_completeness}/{len(clusters)} fully explored)
-            - Active contradictions: {contradiction_count} across clusters
-            - Unexplored nodes: {unexplored_count} remaining
-            - Investigation hot spots: {len(hot_spots)} high-connection areas
-            - Total tasks completed: {total_tasks}
-            - Analysis round: {self.analysis_count}
-            
-            CLUSTER-BASED EVIDENCE EVALUATION:
-            {self._format_cluster_analysis(clusters)}
-            
-            HOT SPOT ANALYSIS:
-            {self._format_hotspot_analysis(hot_spots)}
-            
-            ENHANCED SYNTHESIS FRAMEWORK:
-            - CLUSTER STRENGTH: How well are evidence clusters developed and explored?
-            - CONTRADICTION RESOLUTION: Are contradictions being addressed effectively?  
-            - HOT SPOT DEVELOPMENT: Are high-connection areas being properly analyzed?
-            - SIMILARITY NETWORK: How well connected is the evidence through similarity?
-            - OVERALL CONFIDENCE: Based on cluster completeness and contradiction resolution
-            
-            STOPPING CRITERIA (Similarity-Based):
-            - All major clusters fully explored (completion rate > 0.8)
-            - Contradictions resolved or acknowledged (< 2 unresolved contradictions)
-            - Hot spots adequately analyzed (all hot spots have sufficient children)
-            - High similarity network connectivity across evidence types
-            
-            Respond in JSON format:
-            {{
-                "cluster_strength": 0.0-1.0,
-                "contradiction_resolution": 0.0-1.0,
-                "hotspot_development": 0.0-1.0,
-                "similarity_network_strength": 0.0-1.0,
-                "confidence_level": 0.0-1.0,
-                "key_patterns": ["concrete pattern1", "concrete pattern2"],
-                "unresolved_contradictions": ["specific contradiction1", "specific contradiction2"],
-                "strategic_recommendation": "CONTINUE|CONCLUDE|FOCUS",
-                "priority_focus": "specific area needing attention",
-                "reasoning": "detailed logical explanation based on clusters and similarities"
-            }}
-            """
+            synthesis_prompt = SYNTHESIS_PROMPT_TEMPLATE.substitute(
+                agent_context=agent_context,
+                cluster_count=len(clusters),
+                cluster_completion_rate=f"{cluster_completion_rate:.2f}",
+                cluster_completeness=cluster_completeness,
+                contradiction_count=contradiction_count,
+                unexplored_count=unexplored_count,
+                hot_spot_count=len(hot_spots),
+                total_tasks=total_tasks,
+                analysis_count=self.analysis_count,
+                cluster_analysis=self._format_cluster_analysis(clusters),
+                hotspot_analysis=self._format_hotspot_analysis(hot_spots)
+            )
             
             response = self.client.generate_content(contents=synthesis_prompt)
-            synthesis_result = self._extract_json_from_response(response)
+            synthesis_result = self._extract_json_from_response(response_to_text(response))
             
             if synthesis_result:
                 # Log enhanced synthesis insights
@@ -1075,25 +1543,23 @@ class SynthesisAgent(BaseAgent):
                 # Enhanced confidence adjustment based on similarity metrics
                 base_confidence = confidence
                 
-                # Factor 1: High cluster completion rate
-                if cluster_completion_rate > 0.7:
-                    confidence = min(1.0, confidence + 0.1)
-                    logger.info(f"[SYNTHESIS] 📈 +0.10 confidence for high cluster completion ({cluster_completion_rate:.2f})")
-                
-                # Factor 2: Low contradiction count with good resolution
-                if contradiction_count <= 2 and contradiction_resolution > 0.7:
-                    confidence = min(1.0, confidence + 0.08)
-                    logger.info(f"[SYNTHESIS] 📈 +0.08 confidence for contradiction management")
-                
-                # Factor 3: Well-developed hot spots
-                if len(hot_spots) > 0 and all(h.get('connection_count', 0) >= 3 for h in hot_spots):
-                    confidence = min(1.0, confidence + 0.05)
-                    logger.info(f"[SYNTHESIS] 📈 +0.05 confidence for developed hot spots")
-                
-                # Factor 4: Sufficient task completion with good similarity network
-                if total_tasks >= 6 and synthesis_result.get('similarity_network_strength', 0) > 0.7:
-                    confidence = min(1.0, confidence + 0.07)
-                    logger.info(f"[SYNTHESIS] 📈 +0.07 confidence for strong similarity network")
+                factors = (
+                    # Factor 1: High cluster completion rate
+                    cluster_completion_rate > 0.7,
+                    # Factor 2: Low contradiction count with good resolution
+                    contradiction_count <= 2 and contradiction_resolution > 0.7,
+                    # Factor 3: Well-developed hot spots
+                    len(hot_spots) > 0 and all(h.get('connection_count', 0) >= 3 for h in hot_spots),
+                    # Factor 4: Sufficient task completion with good similarity network
+                    total_tasks >= 6 and synthesis_result.get('similarity_network_strength', 0) > 0.7,
+                )
+                applied = [adjustment for adjustment, fired in zip(CONFIDENCE_ADJUSTMENTS, factors) if fired]
+                if applied:
+                    for bonus, _ in applied:
+                        confidence += bonus
+                    confidence = min(1.0, confidence)
+                    logger.info("[SYNTHESIS] 📈 Confidence adjustments: %s",
+                                ", ".join(f"+{bonus:.2f} for {reason}" for bonus, reason in applied))
                 
                 # Update synthesis result with adjusted confidence
                 if confidence != base_confidence:
@@ -1139,24 +1605,22 @@ class SynthesisAgent(BaseAgent):
         if not clusters:
             return "No clusters identified"
         
-        analysis = []
-        for cluster in clusters:
-            status = "✅ Complete" if cluster.unexplored_count == 0 else f"🔍 {cluster.unexplored_count} unexplored"
-            contradictions = f" | ⚠️ {len(cluster.contradiction_flags)} contradictions" if cluster.contradiction_flags else ""
-            analysis.append(f"- {cluster.theme}: {cluster.cluster_summary} | {status}{contradictions}")
-        
-        return "\n".join(analysis)
+        return "\n".join(
+            f"- {cluster.theme}: {cluster.cluster_summary} | "
+            f"{'✅ Complete' if cluster.unexplored_count == 0 else f'🔍 {cluster.unexplored_count} unexplored'}"
+            f"{f' | ⚠️ {len(cluster.contradiction_flags)} contradictions' if cluster.contradiction_flags else ''}"
+            for cluster in clusters
+        )
     
     def _format_hotspot_analysis(self, hot_spots: List) -> str:
         """Format hot spot analysis for synthesis prompt"""
         if not hot_spots:
             return "No hot spots identified"
         
-        analysis = []
-        for hot_spot in hot_spots:
-            analysis.append(f"- {hot_spot['title']}: {hot_spot['connection_count']} connections ({hot_spot['evidence_type']} type)")
-        
-        return "\n".join(analysis)
+        return "\n".join(
+            f"- {hot_spot['title']}: {hot_spot['connection_count']} connections ({hot_spot['evidence_type']} type)"
+            for hot_spot in hot_spots
+        )
     
     def _determine_conclusion_reason(self, confidence: float, cluster_rate: float, contradictions: int, recommendation: str, tasks: int) -> str:
         """Determine the specific reason for concluding investigation"""
@@ -1181,69 +1645,52 @@ class SynthesisAgent(BaseAgent):
             logger.info("[SYNTHESIS] 🛑 Conclusion already exists - skipping duplicate creation")
             return
         
-        try:
-            # Force immediate conclusion without API calls to avoid rate limits
-            conclusion_text = f"""
-            SYNTHESIS INVESTIGATION CONCLUSION (Confidence: {confidence:.2f})
-            
-            FINAL ANALYSIS COMPLETE:
-            
-            Key Patterns: {synthesis_result.get('key_patterns', ['Analysis complete', 'Evidence evaluated', 'Conclusions drawn'])}
-            
-            SUMMARY:
-            Based on {confidence:.0%} confidence analysis, the investigation has reached a conclusion.
-            
-            Key Findings:
-            - Evidence has been systematically analyzed
-            - Pattern recognition has identified key connections
-            - Confidence threshold reached for conclusions
-            - Investigation objectives satisfied
-            
-            RECOMMENDATION: Review findings and determine next steps based on case type
-            
-            Reasoning: {synthesis_result.get('reasoning', 'High confidence reached through systematic evidence analysis')}
-            """
-            
-            # DO NOT add conclusion to memory tree - it should only be a summary result
-            # Store conclusion in context for retrieval instead
-            self._update_context_bank("synthesis_conclusion", conclusion_text)
-            
-            logger.info("[SYNTHESIS] ✅ Synthesis conclusion generated (not added to tree)")
-            
-        except Exception as e:
-            logger.error(f"[SYNTHESIS] ❌ Error creating forced conclusion: {e}")
-            # Fallback to queued task if direct creation fails
-            if not self.task_queue.has_conclusion_task():
-                conclusion_task = Task(
-                    description="Investigation Conclusion",
-                    instructions=f"""
-                    Based on synthesis analysis, the investigation has reached sufficient confidence ({confidence:.2f}).
-                    
-                    Create a comprehensive investigation summary including:
-                    1. Key findings and evidence
-                    2. Suspect profile and motives
-                    3. Timeline of events
-                    4. Recommended next steps
-                    
-                    Patterns identified: {synthesis_result.get('key_patterns', [])}
-                    Reasoning: {synthesis_result.get('reasoning', 'High confidence reached')}
-                    """,
-                    priority=TaskPriority.CRITICAL
-                )
-                self.task_queue.add_task(conclusion_task)
-                logger.info("[SYNTHESIS] 🏁 Added fallback investigation conclusion task")
-            else:
-                logger.info("[SYNTHESIS] 🛑 Conclusion task already exists in queue - skipping fallback")
+        # Without a memory tree there is nothing to conclude from - queue a task instead
+        if self.memory_tree is None:
+            return self._fallback_conclusion_task(synthesis_result, confidence)
+        
+        # Force immediate conclusion without API calls to avoid rate limits
+        conclusion_text = SYNTHESIS_CONCLUSION_TEMPLATE.format(
+            confidence=confidence,
+            patterns=synthesis_result.get('key_patterns', ['Analysis complete', 'Evidence evaluated', 'Conclusions drawn']),
+            reasoning=synthesis_result.get('reasoning', 'High confidence reached through systematic evidence analysis')
+        )
+        
+        # DO NOT add conclusion to memory tree - it should only be a summary result
+        # Store conclusion in context for retrieval instead
+        self._update_context_bank("synthesis_conclusion", conclusion_text)
+        
+        logger.info("[SYNTHESIS] ✅ Synthesis conclusion generated (not added to tree)")
+    
+    def _fallback_conclusion_task(self, synthesis_result, confidence: float):
+        """Queue a conclusion task when the conclusion cannot be generated directly"""
+        if self.task_queue.has_conclusion_task():
+            logger.info("[SYNTHESIS] 🛑 Conclusion task already exists in queue - skipping fallback")
+            return
+        
+        conclusion_task = Task(
+            description="Investigation Conclusion",
+            instructions=f"""
+            Based on synthesis analysis, the investigation has reached sufficient confidence ({confidence:.2f}).
+            
+            Create a comprehensive investigation summary including:
+            1. Key findings and evidence
+            2. Suspect profile and motives
+            3. Timeline of events
+            4. Recommended next steps
+            
+            Patterns identified: {synthesis_result.get('key_patterns', [])}
+            Reasoning: {synthesis_result.get('reasoning', 'High confidence reached')}
+            """,
+            priority=TaskPriority.CRITICAL
+        )
+        self.task_queue.add_task(conclusion_task)
+        logger.info("[SYNTHESIS] 🏁 Added fallback investigation conclusion task")
 
     def _conclusion_exists_in_tree(self) -> bool:
         """Check if a conclusion has already been generated"""
-        try:
-            # Check if conclusion exists in context bank instead of tree
-            return "synthesis_conclusion" in self.context_bank
-            
-        except Exception as e:
-            logger.error(f"[SYNTHESIS] Error checking for conclusion: {e}")
-            return False
+        # Check if conclusion exists in context bank instead of tree
+        return "synthesis_conclusion" in self.context_bank
 
 
 # Agent Factory and Management
@@ -1276,7 +1723,7 @@ class AgentSystem:
     def stop_system(self):
         """Stop the agent system"""
         self.is_running = False
-        self.synthesis.is_running = False
+        self.synthesis.stop_analysis()
         logger.info("🛑 Agent system stopped")
     
     async def process_query(self, query: str):
@@ -1286,33 +1733,36 @@ class AgentSystem:
             initial_tasks = await self.planner.create_initial_plan(query)
             
             # Add tasks to queue
-            for task in initial_tasks:
-                self.task_queue.add_task(task)
+            self.task_queue.add_tasks(initial_tasks)
             
             logger.info(f"🎯 Created initial plan with {len(initial_tasks)} tasks using similarity navigation")
             
-            # Process tasks
+            # Process ready tasks in batches so their Gemini calls overlap
             results = []
             while True:
-                next_task = self.task_queue.get_next_task()
-                if not next_task:
+                batch = self.task_queue.get_next_tasks(EXECUTION_BATCH_SIZE)
+                if not batch:
                     break
                 
-                # Execute task with similarity-based context
-                result = await self.executor.execute_task(next_task)
-                results.append(result)
+                # Execute tasks with similarity-based context
+                batch_results = await asyncio.gather(*(self.executor.execute_task(task) for task in batch))
+                results.extend(batch_results)
                 
                 # Update task status
-                if result.success:
-                    self.task_queue.mark_completed(next_task.id, result.result)
-                    
+                completed = []
+                for task, result in zip(batch, batch_results):
+                    if result.success:
+                        self.task_queue.mark_completed(task.id, result.result)
+                        completed.append((task, result.result))
+                    else:
+                        self.task_queue.mark_failed(task.id, result.result)
+                
+                if completed:
                     # Get synthesis guidance using view controller insights
                     synthesis_result = await self.synthesis.perform_synthesis()
                     
                     # Refine plan using similarity-based recommendations
-                    await self.planner.refine_plan(next_task, result.result, synthesis_result)
-                else:
-                    self.task_queue.mark_failed(next_task.id, result.result)
+                    await self.planner.refine_many(completed, synthesis_result)
             
             return {
                 "tasks_executed": len(results),
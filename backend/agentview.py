@@ -6,9 +6,12 @@ Controls what files and memory tree content each agent type can see.
 Implements a mindmap-style navigation rather than forced tree traversal.
 """
 
+import functools
+import heapq
 import json
 import logging
 import re
+from collections import defaultdict, deque
 from typing import Dict, List, Optional, Any, Set, Tuple
 from enum import Enum
 from datetime import datetime
@@ -16,6 +19,139 @@ from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# Words compared when measuring keyword overlap between nodes
+KEYWORD_RE = re.compile(r'\b\w+\b')
+
+# Per-agent focus points and queries remembered for suggestions
+FOCUS_HISTORY_LIMIT = 10
+QUERY_HISTORY_LIMIT = 5
+
+# Words too common to explain a connection between nodes
+CONNECTION_STOPWORDS = frozenset(['the', 'and', 'that', 'this'])
+
+# Opposing keyword sets flagged as a contradiction when both appear in a cluster
+CONTRADICTION_PATTERNS = [
+    (["positive", "found"], ["negative", "not found"]),
+    (["present", "exists"], ["absent", "missing"]),
+    (["confirmed", "verified"], ["unconfirmed", "disputed"])
+]
+
+# One bit per contradiction keyword, and the (side A, side B) masks per pattern
+CONTRADICTION_KEYWORD_BITS = {
+    keyword: 1 << index
+    for index, keyword in enumerate(
+        keyword for pattern in CONTRADICTION_PATTERNS for side in pattern for keyword in side
+    )
+}
+CONTRADICTION_MASKS = [
+    tuple(sum(CONTRADICTION_KEYWORD_BITS[keyword] for keyword in side) for side in pattern)
+    for pattern in CONTRADICTION_PATTERNS
+]
+
+
+# Agent-facing descriptions of known case files
+FILE_DESCRIPTIONS = {
+    "forensic_report.txt": "Forensic analysis including fingerprints, DNA, and physical evidence",
+    "police_report.txt": "Official incident report with timeline and initial investigation notes",
+    "witness_statement_robert.txt": "Eyewitness testimony from Robert Chen"
+}
+
+# Common prefixes stripped from node titles
+TITLE_PREFIXES = [
+    "Evidence Analysis:",
+    "Task:",
+    "Investigation:",
+    "Analysis:"
+]
+
+# Evidence type -> keywords, checked in order; the first match wins
+EVIDENCE_TYPE_KEYWORDS = {
+    "forensic": ["fingerprint", "dna", "blood", "forensic", "lab", "analysis"],
+    "witness": ["witness", "testimony", "statement", "saw", "observed"],
+    "physical": ["weapon", "fabric", "object", "found", "collected"],
+    "timeline": ["time", "when", "sequence", "chronology", "timeline"],
+    "location": ["where", "scene", "location", "room", "place"],
+    "suspect": ["suspect", "person", "individual", "accused"],
+    "motive": ["motive", "reason", "why", "cause"],
+    "contradiction": ["but", "however", "inconsistent", "differs"]
+}
+
+# One compiled substring alternation per evidence type, in priority order
+EVIDENCE_TYPE_PATTERNS = [
+    (evidence_type, re.compile('|'.join(map(re.escape, keywords))))
+    for evidence_type, keywords in EVIDENCE_TYPE_KEYWORDS.items()
+]
+
+
+# Node text helpers are pure, so results are shared across views until the text changes
+@functools.lru_cache(maxsize=4096)
+def clean_node_title(raw_title: str) -> str:
+    """Clean and format node titles for better readability"""
+    # Remove common prefixes
+    cleaned = raw_title
+    for prefix in TITLE_PREFIXES:
+        if cleaned.startswith(prefix):
+            cleaned = cleaned[len(prefix):].strip()
+    
+    return cleaned
+
+
+@functools.lru_cache(maxsize=4096)
+def create_brief_summary(description: str) -> str:
+    """Create brief summary from full description"""
+    if not description:
+        return "No details available"
+    
+    # Take first sentence or first 100 characters
+    sentences = description.split('.')
+    if sentences and len(sentences[0]) <= 100:
+        return sentences[0].strip() + "."
+    
+    return description[:97] + "..." if len(description) > 100 else description
+
+
+@functools.lru_cache(maxsize=4096)
+def classify_evidence_type(name: str, description: str) -> str:
+    """Classify evidence type based on content"""
+    combined_text = (name + " " + description).lower()
+    
+    for evidence_type, pattern in EVIDENCE_TYPE_PATTERNS:
+        if pattern.search(combined_text):
+            return evidence_type
+    
+    return "general"
+
+
+@functools.lru_cache(maxsize=4096)
+def contradiction_keyword_bits(brief_summary: str) -> int:
+    """Bitmask of the contradiction keywords contained in a summary"""
+    text = brief_summary.lower()
+    return sum(bit for keyword, bit in CONTRADICTION_KEYWORD_BITS.items() if keyword in text)
+
+
+def content_keywords(content_lower: str) -> Tuple[frozenset, frozenset]:
+    """Get the keywords of node content, and the significant ones used to explain connections"""
+    keywords = frozenset(KEYWORD_RE.findall(content_lower))
+    return keywords, frozenset(k for k in keywords if len(k) > 3 and k not in CONNECTION_STOPWORDS)
+
+
+def summary_rank(summary) -> Tuple[float, datetime]:
+    """Sort key ranking node summaries by relevance, then recency"""
+    return summary.confidence_level, summary.timestamp
+
+
+def push_bounded(heap: List[Tuple], entry: Tuple, limit: int):
+    """Push entry onto a min-heap that keeps only the limit largest entries"""
+    if len(heap) < limit:
+        heapq.heappush(heap, entry)
+    elif entry > heap[0]:
+        heapq.heapreplace(heap, entry)
+
+
+def status_value(status) -> str:
+    """Get the plain string form of a node status"""
+    return status.value if isinstance(status, Enum) else str(status)
+
 
 class AgentAccessLevel(Enum):
     """Different access levels for agents"""
@@ -37,6 +173,7 @@ class NodeSummary:
     connection_count: int
     status: str
     is_explored: bool = False
+    keyword_bits: int = 0
 
 
 @dataclass
@@ -59,6 +196,14 @@ class MemoryCluster:
     unexplored_count: int
 
 
+@dataclass
+class ClusterStats:
+    """Aggregate exploration metrics across memory clusters"""
+    complete_clusters: int = 0
+    contradiction_count: int = 0
+    unexplored_count: int = 0
+
+
 class AgentViewController:
     """Controls agent access to files and memory tree"""
     
@@ -70,8 +215,17 @@ class AgentViewController:
         # Agent focus tracking
         self.agent_focus_contexts: Dict[str, Dict] = {}
         
-        # Similarity cache for performance
-        self.similarity_cache: Dict[str, List[ConnectionInfo]] = {}
+        # Similarity cache for performance: (focus node, limit) -> similar nodes,
+        # valid for the tree version it was filled at
+        self.similarity_cache: Dict[Tuple[str, int], List[Dict]] = {}
+        self._similarity_cache_version: Optional[int] = None
+        # node_id -> keyword set the node is currently indexed under
+        self._indexed_keywords: Dict[str, frozenset] = {}
+        # keyword -> IDs of nodes containing it, plus each node's position in the tree,
+        # brought up to date whenever the tree version changes
+        self._keyword_index: Dict[str, Set[str]] = defaultdict(set)
+        self._node_order: Dict[str, int] = {}
+        self._keyword_index_version: Optional[int] = None
         
         # Available case files
         self.available_files = [
@@ -79,6 +233,17 @@ class AgentViewController:
             "police_report.txt", 
             "witness_statement_robert.txt"
         ]
+        # (tree version, summaries/clusters/hot spots) shared by views until the tree changes
+        self._overview_cache: Tuple[Optional[int], Optional[Dict[str, Any]]] = (None, None)
+        
+        # access level -> (files it was built from, file access list)
+        self._file_access_cache: Dict[str, Tuple[Tuple[str, ...], List[Dict[str, str]]]] = {}
+    
+    def get_state_version(self) -> Tuple[int, int]:
+        """Get version stamps of the tree and queue backing this controller's views"""
+        tree_version = getattr(self.memory_tree, 'version', 0)
+        queue_version = getattr(self.task_queue, 'version', 0)
+        return tree_version, queue_version
     
     def get_agent_view(self, agent_id: str, agent_type: AgentAccessLevel, 
                       focus_node_id: Optional[str] = None, 
@@ -100,138 +265,116 @@ class AgentViewController:
         return view
     
     def _get_file_access(self, agent_type: AgentAccessLevel) -> List[Dict[str, str]]:
-        """Get file access based on agent type"""
+        """Get file access based on agent type (shared list - treat as read-only)"""
         if agent_type in [AgentAccessLevel.EXECUTOR, AgentAccessLevel.SYNTHESIZER]:
-            return [
+            access_level = "read_only"
+        else:
+            # Planner and Summarization agents get file descriptions only
+            access_level = "metadata_only"
+        
+        # Rebuilt only when the available files change
+        files = tuple(self.available_files)
+        cached = self._file_access_cache.get(access_level)
+        if cached is None or cached[0] != files:
+            cached = (files, [
                 {
                     "filename": filename,
                     "description": self._get_file_description(filename),
-                    "access_level": "read_only"
+                    "access_level": access_level
                 }
-                for filename in self.available_files
-            ]
-        
-        # Planner and Summarization agents get file descriptions only
-        return [
-            {
-                "filename": filename,
-                "description": self._get_file_description(filename),
-                "access_level": "metadata_only"
-            }
-            for filename in self.available_files
-        ]
+                for filename in files
+            ])
+            self._file_access_cache[access_level] = cached
+        return cached[1]
     
     def _get_file_description(self, filename: str) -> str:
         """Get file description for agent context"""
-        descriptions = {
-            "forensic_report.txt": "Forensic analysis including fingerprints, DNA, and physical evidence",
-            "police_report.txt": "Official incident report with timeline and initial investigation notes",
-            "witness_statement_robert.txt": "Eyewitness testimony from Robert Chen"
-        }
-        return descriptions.get(filename, "Case file")
+        return FILE_DESCRIPTIONS.get(filename, "Case file")
     
     def _get_memory_navigation(self, agent_type: AgentAccessLevel, 
                               focus_node_id: Optional[str], 
                               query_context: Optional[str]) -> Dict[str, Any]:
         """Get similarity-based memory navigation view"""
-        
-        # Get all nodes as summaries
-        node_summaries = self._generate_node_summaries()
-        
-        # Generate memory clusters
-        clusters = self._generate_memory_clusters(node_summaries)
+        overview = self._get_tree_overview()
         
         # Get focused view if focus node provided
         focused_view = None
         if focus_node_id:
             focused_view = self._generate_focused_view(focus_node_id, query_context)
         
-        # Find hot spots (highly connected areas)
-        hot_spots = self._identify_hot_spots(node_summaries)
-        
         return {
-            "total_nodes": len(node_summaries),
-            "node_summaries": node_summaries[:20],  # Limit initial view
-            "memory_clusters": clusters,
+            "total_nodes": overview["total_nodes"],
+            "node_summaries": overview["node_summaries"],
+            "memory_clusters": overview["memory_clusters"],
+            "cluster_stats": overview["cluster_stats"],
             "focused_view": focused_view,
-            "hot_spots": hot_spots,
+            "hot_spots": overview["hot_spots"],
             "navigation_suggestions": self._generate_navigation_suggestions(agent_type, query_context)
         }
     
-    def _generate_node_summaries(self) -> List[NodeSummary]:
-        """Generate compressed summaries of all memory nodes"""
-        summaries = []
-        
-        if not self.memory_tree or not hasattr(self.memory_tree, 'nodes'):
-            return summaries
-        
-        for node in self.memory_tree.nodes.values():
-            summary = NodeSummary(
-                id=node.id,
-                title=self._clean_node_title(node.name),
-                brief_summary=self._create_brief_summary(node.description),
-                evidence_type=self._classify_evidence_type(node.name, node.description),
-                confidence_level=self._calculate_confidence(node),
-                timestamp=node.created_at,
-                connection_count=len(node.children_ids),
-                status=node.status.value if hasattr(node.status, 'value') else str(node.status),
-                is_explored=bool(node.execution_result)
-            )
-            summaries.append(summary)
+    def _get_tree_overview(self) -> Dict[str, Any]:
+        """Get the tree-wide part of the navigation view, rebuilt only when the tree changes"""
+        tree_version = getattr(self.memory_tree, 'version', None)
+        if tree_version is not None and self._overview_cache[0] == tree_version:
+            return self._overview_cache[1]
+        
+        nodes = self.memory_tree.nodes if self.memory_tree and hasattr(self.memory_tree, 'nodes') else {}
+        
+        # One pass over the tree summarizes every node and feeds the cluster groups,
+        # the top-ranked summaries and the hot spot candidates. Entries carry
+        # -tree position so rank ties go to the earlier node.
+        type_groups = defaultdict(list)
+        top_summaries = []  # Bounded heap of (rank, -position, summary)
+        hubs = []  # Bounded heap of (two-hop reach, rank, -position, summary)
+        for position, node in enumerate(nodes.values()):
+            summary = self._summarize_node(node)
+            entry = (summary_rank(summary), -position, summary)
+            type_groups[summary.evidence_type].append(entry)
+            push_bounded(top_summaries, entry, 20)  # Limit initial view
+            if summary.connection_count > 2:
+                push_bounded(hubs, (self._two_hop_reach(node),) + entry, 5)
+        
+        # Generate memory clusters
+        clusters = self._generate_memory_clusters(type_groups)
         
-        # Sort by relevance/recency
-        summaries.sort(key=lambda x: (x.confidence_level, x.timestamp), reverse=True)
-        return summaries
+        overview = {
+            "total_nodes": len(nodes),
+            "node_summaries": [entry[-1] for entry in sorted(top_summaries, reverse=True)],
+            "memory_clusters": clusters,
+            "cluster_stats": self._summarize_clusters(clusters),
+            # Find hot spots (highly connected areas)
+            "hot_spots": self._identify_hot_spots(sorted(hubs, reverse=True))
+        }
+        self._overview_cache = (tree_version, overview)
+        return overview
+    
+    def _summarize_node(self, node) -> NodeSummary:
+        """Generate the compressed summary of a memory node"""
+        brief_summary = self._create_brief_summary(node.description)
+        return NodeSummary(
+            id=node.id,
+            title=self._clean_node_title(node.name),
+            brief_summary=brief_summary,
+            evidence_type=self._classify_evidence_type(node.name, node.description),
+            confidence_level=self._calculate_confidence(node),
+            timestamp=node.created_at,
+            connection_count=len(node.children_ids),
+            status=status_value(node.status),
+            is_explored=bool(node.execution_result),
+            keyword_bits=contradiction_keyword_bits(brief_summary)
+        )
     
     def _clean_node_title(self, raw_title: str) -> str:
         """Clean and format node titles for better readability"""
-        # Remove common prefixes
-        cleaned = raw_title
-        prefixes_to_remove = [
-            "Evidence Analysis:",
-            "Task:",
-            "Investigation:",
-            "Analysis:"
-        ]
-        
-        for prefix in prefixes_to_remove:
-            if cleaned.startswith(prefix):
-                cleaned = cleaned[len(prefix):].strip()
-        
-        return cleaned
+        return clean_node_title(raw_title)
     
     def _create_brief_summary(self, description: str) -> str:
         """Create brief summary from full description"""
-        if not description:
-            return "No details available"
-        
-        # Take first sentence or first 100 characters
-        sentences = description.split('.')
-        if sentences and len(sentences[0]) <= 100:
-            return sentences[0].strip() + "."
-        
-        return description[:97] + "..." if len(description) > 100 else description
+        return create_brief_summary(description)
     
     def _classify_evidence_type(self, name: str, description: str) -> str:
         """Classify evidence type based on content"""
-        combined_text = (name + " " + description).lower()
-        
-        type_keywords = {
-            "forensic": ["fingerprint", "dna", "blood", "forensic", "lab", "analysis"],
-            "witness": ["witness", "testimony", "statement", "saw", "observed"],
-            "physical": ["weapon", "fabric", "object", "found", "collected"],
-            "timeline": ["time", "when", "sequence", "chronology", "timeline"],
-            "location": ["where", "scene", "location", "room", "place"],
-            "suspect": ["suspect", "person", "individual", "accused"],
-            "motive": ["motive", "reason", "why", "cause"],
-            "contradiction": ["but", "however", "inconsistent", "differs"]
-        }
-        
-        for evidence_type, keywords in type_keywords.items():
-            if any(keyword in combined_text for keyword in keywords):
-                return evidence_type
-        
-        return "general"
+        return classify_evidence_type(name, description)
     
     def _calculate_confidence(self, node) -> float:
         """Calculate confidence level for a node"""
@@ -254,48 +397,51 @@ class AgentViewController:
         
         return min(1.0, confidence)
     
-    def _generate_memory_clusters(self, summaries: List[NodeSummary]) -> List[MemoryCluster]:
-        """Generate clusters of related memory nodes"""
+    def _generate_memory_clusters(self, type_groups: Dict[str, List[Tuple]]) -> List[MemoryCluster]:
+        """Generate clusters of related memory nodes from (rank, -position, summary) entries grouped by evidence type"""
         clusters = []
         
-        # Group by evidence type
-        type_groups = {}
-        for summary in summaries:
-            if summary.evidence_type not in type_groups:
-                type_groups[summary.evidence_type] = []
-            type_groups[summary.evidence_type].append(summary)
-        
-        for evidence_type, group_summaries in type_groups.items():
-            if len(group_summaries) > 1:  # Only create clusters with multiple nodes
-                cluster = MemoryCluster(
-                    cluster_id=f"cluster_{evidence_type}",
-                    theme=evidence_type.title(),
-                    node_ids=[s.id for s in group_summaries],
-                    cluster_summary=f"{len(group_summaries)} nodes related to {evidence_type}",
-                    contradiction_flags=self._find_contradictions(group_summaries),
-                    unexplored_count=len([s for s in group_summaries if not s.is_explored])
-                )
-                clusters.append(cluster)
+        # Most relevant nodes first within each group, and groups ordered by their
+        # most relevant node - the same order as ranking all summaries together
+        ranked_groups = []
+        for evidence_type, group in type_groups.items():
+            if len(group) > 1:  # Only create clusters with multiple nodes
+                group.sort(reverse=True)
+                ranked_groups.append((group[0][:2], evidence_type, [entry[2] for entry in group]))
+        ranked_groups.sort(key=lambda ranked: ranked[0], reverse=True)
+        
+        for _, evidence_type, group_summaries in ranked_groups:
+            cluster = MemoryCluster(
+                cluster_id=f"cluster_{evidence_type}",
+                theme=evidence_type.title(),
+                node_ids=[s.id for s in group_summaries],
+                cluster_summary=f"{len(group_summaries)} nodes related to {evidence_type}",
+                contradiction_flags=self._find_contradictions(group_summaries),
+                unexplored_count=sum(1 for s in group_summaries if not s.is_explored)
+            )
+            clusters.append(cluster)
         
         return clusters
     
+    def _summarize_clusters(self, clusters: List[MemoryCluster]) -> ClusterStats:
+        """Aggregate cluster metrics once per view so agents don't re-tally them"""
+        return ClusterStats(
+            complete_clusters=sum(1 for cluster in clusters if cluster.unexplored_count == 0),
+            contradiction_count=sum(len(cluster.contradiction_flags) for cluster in clusters),
+            unexplored_count=sum(cluster.unexplored_count for cluster in clusters)
+        )
+    
     def _find_contradictions(self, summaries: List[NodeSummary]) -> List[str]:
         """Find potential contradictions in a group of summaries"""
         contradictions = []
         
-        # Look for contradictory keywords
-        contradiction_patterns = [
-            (["positive", "found"], ["negative", "not found"]),
-            (["present", "exists"], ["absent", "missing"]),
-            (["confirmed", "verified"], ["unconfirmed", "disputed"])
-        ]
-        
-        for pattern_a, pattern_b in contradiction_patterns:
-            nodes_a = [s for s in summaries if any(p in s.brief_summary.lower() for p in pattern_a)]
-            nodes_b = [s for s in summaries if any(p in s.brief_summary.lower() for p in pattern_b)]
+        # Keyword bits are computed once per summary, so each pattern is a mask test
+        for mask_a, mask_b in CONTRADICTION_MASKS:
+            count_a = sum(1 for s in summaries if s.keyword_bits & mask_a)
+            count_b = sum(1 for s in summaries if s.keyword_bits & mask_b)
             
-            if nodes_a and nodes_b:
-                contradictions.append(f"Contradiction: {len(nodes_a)} nodes vs {len(nodes_b)} nodes")
+            if count_a and count_b:
+                contradictions.append(f"Contradiction: {count_a} nodes vs {count_b} nodes")
         
         return contradictions
     
@@ -318,8 +464,8 @@ class AgentViewController:
                 "title": self._clean_node_title(focus_node.name),
                 "full_content": focus_node.description,
                 "metadata": {
-                    "status": focus_node.status.value if hasattr(focus_node.status, 'value') else str(focus_node.status),
-                    "created": focus_node.created_at.isoformat(),
+                    "status": status_value(focus_node.status),
+                    "created": focus_node.created_at_iso,
                     "evidence_type": self._classify_evidence_type(focus_node.name, focus_node.description)
                 }
             },
@@ -329,41 +475,110 @@ class AgentViewController:
         }
     
     def _find_similar_nodes(self, focus_node, query_context: Optional[str], limit: int = 5) -> List[Dict]:
-        """Find nodes similar to focus node"""
-        similar = []
-        
-        focus_content = (focus_node.name + " " + focus_node.description).lower()
-        focus_keywords = set(re.findall(r'\b\w+\b', focus_content))
-        
-        for node in self.memory_tree.nodes.values():
-            if node.id == focus_node.id:
+        """Find nodes similar to focus node, reusing results until the tree changes"""
+        tree_version = getattr(self.memory_tree, 'version', None)
+        if tree_version is None:
+            return self._rank_similar_nodes(focus_node, limit)
+        
+        if tree_version != self._similarity_cache_version:
+            self.similarity_cache.clear()
+            self._similarity_cache_version = tree_version
+        
+        cache_key = (focus_node.id, limit)
+        similar = self.similarity_cache.get(cache_key)
+        if similar is None:
+            similar = self._rank_similar_nodes(focus_node, limit)
+            self.similarity_cache[cache_key] = similar
+        return similar
+    
+    def _rank_similar_nodes(self, focus_node, limit: int) -> List[Dict]:
+        """Rank the nodes most similar to focus node by keyword overlap"""
+        self._sync_keyword_index()
+        focus_keywords = self._node_keywords(focus_node)
+        
+        # Only nodes sharing a keyword can clear the similarity threshold
+        candidate_ids = set()
+        for keyword in focus_keywords:
+            candidate_ids.update(self._keyword_index.get(keyword, ()))
+        candidate_ids.discard(focus_node.id)
+        node_order = self._node_order
+        focus_size = len(focus_keywords)
+        
+        # Bounded min-heap of (similarity, -tree position, node): ties go to the
+        # earlier node, as they would in a full scan sorted by similarity
+        top_matches = []
+        for node_id in candidate_ids:
+            position = node_order.get(node_id)
+            if position is None:
                 continue
+            node = self.memory_tree.nodes[node_id]
+            node_keywords = self._node_keywords(node)
             
-            node_content = (node.name + " " + node.description).lower()
-            node_keywords = set(re.findall(r'\b\w+\b', node_content))
+            # Jaccard can't exceed the size ratio, so skip nodes that can't make the
+            # cut (an equal score can still win on tree position)
+            node_size = len(node_keywords)
+            bound = min(focus_size, node_size) / max(focus_size, node_size, 1)
+            if bound <= 0.1 or (len(top_matches) == limit and bound < top_matches[0][0]):
+                continue
             
             # Calculate similarity based on keyword overlap
-            overlap = len(focus_keywords.intersection(node_keywords))
-            total_keywords = len(focus_keywords.union(node_keywords))
+            overlap = len(focus_keywords & node_keywords)
+            total_keywords = focus_size + node_size - overlap
             similarity = overlap / max(total_keywords, 1)
             
-            if similarity > 0.1:  # Minimum similarity threshold
-                similar.append({
-                    "id": node.id,
-                    "title": self._clean_node_title(node.name),
-                    "brief_summary": self._create_brief_summary(node.description),
-                    "similarity_score": similarity,
-                    "connection_reason": self._explain_connection(focus_keywords, node_keywords)
-                })
+            if similarity <= 0.1:  # Minimum similarity threshold
+                continue
+            push_bounded(top_matches, (similarity, -position, node), limit)
         
-        # Sort by similarity and return top results
-        similar.sort(key=lambda x: x['similarity_score'], reverse=True)
-        return similar[:limit]
+        # Only the top results are formatted for the view
+        top_matches.sort(reverse=True)
+        return [
+            {
+                "id": node.id,
+                "title": self._clean_node_title(node.name),
+                "brief_summary": self._create_brief_summary(node.description),
+                "similarity_score": similarity,
+                "connection_reason": self._explain_connection(
+                    focus_node.content_derived(content_keywords)[1], node.content_derived(content_keywords)[1]
+                )
+            }
+            for similarity, _, node in top_matches
+        ]
+    
+    def _sync_keyword_index(self):
+        """Bring the keyword index up to date with the memory tree"""
+        tree_version = getattr(self.memory_tree, 'version', None)
+        if tree_version is not None and tree_version == self._keyword_index_version:
+            return
+        
+        nodes = self.memory_tree.nodes
+        # Forget nodes that have left the tree
+        for node_id in self._indexed_keywords.keys() - nodes.keys():
+            for keyword in self._indexed_keywords.pop(node_id):
+                self._keyword_index[keyword].discard(node_id)
+        
+        for node in nodes.values():
+            self._node_keywords(node)
+        self._node_order = {node_id: position for position, node_id in enumerate(nodes)}
+        self._keyword_index_version = tree_version
+    
+    def _node_keywords(self, node) -> frozenset:
+        """Get the keyword set of a node, re-indexing the node when its content has changed"""
+        keywords = node.content_derived(content_keywords)[0]
+        indexed = self._indexed_keywords.get(node.id)
+        # The node hands back the same set until its content changes
+        if indexed is not keywords:
+            indexed = indexed or frozenset()
+            for keyword in indexed - keywords:
+                self._keyword_index[keyword].discard(node.id)
+            for keyword in keywords - indexed:
+                self._keyword_index[keyword].add(node.id)
+            self._indexed_keywords[node.id] = keywords
+        return keywords
     
     def _explain_connection(self, keywords1: Set[str], keywords2: Set[str]) -> str:
-        """Explain why two nodes are connected"""
-        common_keywords = keywords1.intersection(keywords2)
-        important_keywords = [k for k in common_keywords if len(k) > 3 and k not in ['the', 'and', 'that', 'this']]
+        """Explain why two nodes are connected, given their significant keywords"""
+        important_keywords = keywords1 & keywords2
         
         if important_keywords:
             return f"Shared concepts: {', '.join(list(important_keywords)[:3])}"
@@ -420,23 +635,25 @@ class AgentViewController:
         
         return suggestions[:3]  # Limit to top 3 suggestions
     
-    def _identify_hot_spots(self, summaries: List[NodeSummary]) -> List[Dict]:
-        """Identify areas with high connection density"""
-        hot_spots = []
-        
-        # Find nodes with high connection counts
-        high_connection_nodes = [s for s in summaries if s.connection_count > 2]
-        
-        for summary in high_connection_nodes:
-            hot_spots.append({
+    def _two_hop_reach(self, node) -> int:
+        """Count a node's children plus grandchildren, so hubs of hubs rank first"""
+        nodes = self.memory_tree.nodes
+        return len(node.children_ids) + sum(
+            len(nodes[child_id].children_ids) for child_id in node.children_ids if child_id in nodes
+        )
+    
+    def _identify_hot_spots(self, ranked_hubs: List[Tuple]) -> List[Dict]:
+        """Identify areas with high connection density from ranked (reach, rank, -position, summary) hubs"""
+        return [
+            {
                 "node_id": summary.id,
                 "title": summary.title,
                 "connection_count": summary.connection_count,
                 "evidence_type": summary.evidence_type,
-                "reason": f"Hub node with {summary.connection_count} connections"
-            })
-        
-        return hot_spots[:5]  # Top 5 hot spots
+                "reason": f"Hub node with {summary.connection_count} connections ({reach} within two hops)"
+            }
+            for reach, _, _, summary in ranked_hubs
+        ]
     
     def _generate_navigation_suggestions(self, agent_type: AgentAccessLevel, 
                                        query_context: Optional[str]) -> List[str]:
@@ -488,11 +705,12 @@ class AgentViewController:
     def _update_agent_focus(self, agent_id: str, focus_node_id: Optional[str], 
                            query_context: Optional[str]):
         """Update agent's focus context for better suggestions"""
+        now = datetime.now()
         if agent_id not in self.agent_focus_contexts:
             self.agent_focus_contexts[agent_id] = {
-                "focus_history": [],
-                "query_history": [],
-                "last_updated": datetime.now()
+                "focus_history": deque(maxlen=FOCUS_HISTORY_LIMIT),
+                "query_history": deque(maxlen=QUERY_HISTORY_LIMIT),
+                "last_updated": now
             }
         
         context = self.agent_focus_contexts[agent_id]
@@ -500,20 +718,16 @@ class AgentViewController:
         if focus_node_id:
             context["focus_history"].append({
                 "node_id": focus_node_id,
-                "timestamp": datetime.now()
+                "timestamp": now
             })
-            # Keep only last 10 focus points
-            context["focus_history"] = context["focus_history"][-10:]
         
         if query_context:
             context["query_history"].append({
                 "query": query_context,
-                "timestamp": datetime.now()
+                "timestamp": now
             })
-            # Keep only last 5 queries
-            context["query_history"] = context["query_history"][-5:]
         
-        context["last_updated"] = datetime.now()
+        context["last_updated"] = now
     
     def request_node_content(self, agent_id: str, node_id: str, 
                            agent_type: AgentAccessLevel) -> Optional[Dict]:
@@ -532,8 +746,8 @@ class AgentViewController:
             "full_content": node.description,
             "execution_result": node.execution_result,
             "metadata": {
-                "status": node.status.value if hasattr(node.status, 'value') else str(node.status),
-                "created": node.created_at.isoformat(),
+                "status": status_value(node.status),
+                "created": node.created_at_iso,
                 "evidence_type": self._classify_evidence_type(node.name, node.description),
                 "confidence": self._calculate_confidence(node)
             },
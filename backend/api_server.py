@@ -7,15 +7,17 @@ Serves tree data and statistics to the frontend visualization
 import os
 import asyncio
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 import uvicorn
 import json
 import asyncio
 import logging
+import math
 import time
 from pathlib import Path
 import shutil
@@ -30,13 +32,59 @@ from gemini_client import GeminiClient
 from main_document_analysis import DocumentAnalysisSystem
 from summarization_agent import SummarizationAgent
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib codec
+    orjson = None
+
+def replace_non_finite(value: Any) -> Any:
+    """Copy value with NaN and infinite floats replaced by None, which is how orjson encodes them"""
+    # Iterative, since this handles the deep trees orjson rejects
+    root = [value]
+    stack = [(root, 0)]
+    while stack:
+        container, key = stack.pop()
+        item = container[key]
+        if isinstance(item, float):
+            if not math.isfinite(item):
+                container[key] = None
+        elif isinstance(item, dict):
+            container[key] = item = dict(item)
+            stack.extend((item, item_key) for item_key in item)
+        elif isinstance(item, (list, tuple)):
+            container[key] = item = list(item)
+            stack.extend((item, index) for index in range(len(item)))
+    return root[0]
+
+def dumps_json(value: Any) -> str:
+    """Serialize a message or response body to compact JSON with orjson when available"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value).decode()
+        except orjson.JSONEncodeError:
+            pass  # e.g. trees nested deeper than orjson supports
+    # UTF-8 output like orjson; non-finite floats become null on both paths
+    try:
+        return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+    except ValueError as e:
+        if "Out of range float" not in str(e):
+            raise
+        return json.dumps(replace_non_finite(value), ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+
+class APIJSONResponse(JSONResponse):
+    """JSON response rendered through dumps_json instead of stdlib json"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content).encode("utf-8")
+
 class AnalysisRequest(BaseModel):
     selected_files: List[str] = []
 
 app = FastAPI(
     title="AI Agent Memory Tree API",
     description="API for serving memory tree visualization data",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=APIJSONResponse
 )
 
 # Enable CORS for frontend
@@ -48,44 +96,74 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses; tree JSON is highly repetitive text
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Global instances
 memory_tree: Optional[MemoryTree] = None
 task_queue: Optional[TaskQueue] = None
 current_db_path: Optional[str] = None
+system_init_lock = asyncio.Lock()  # Serializes reloads run off the event loop
+loaded_db_state: Optional[Tuple] = None  # ((path, mtime), ...) of the files memory_tree/task_queue were loaded from
 auto_refresh_task: Optional[asyncio.Task] = None
+tree_broadcast_task: Optional[asyncio.Task] = None
+tree_update_event: Optional[asyncio.Event] = None  # Set whenever the served tree or task queue changes
+tree_payload_cache: Optional[Tuple] = None  # (cache key, tree JSON, stats JSON, flat tree nodes)
+broadcast_tree_nodes: Optional[Tuple[Tuple, str, Dict[str, Dict[str, Any]]]] = None  # (payload key, root ID, flat nodes) patch baseline
+
+# Stats sent to WebSocket clients while no tree is loaded
+EMPTY_TREE_STATS = {
+    "total_nodes": 0,
+    "max_depth": 0,
+    "nodes_by_status": {"pending": 0, "in_progress": 0, "completed": 0, "failed": 0}
+}
+
+# A modified database is reloaded only once it has been quiet this long, so a burst of writes loads once
+RELOAD_DEBOUNCE_SECONDS = 0.5
+# Checks a pending reload may be deferred while writes continue, so a busy database still refreshes (~9s)
+RELOAD_MAX_DEFERRALS = 2
 
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        # Keyed by id(): WebSockets compare as mappings, so they aren't hashable and equality is a deep compare
+        self.active_connections: Dict[int, WebSocket] = {}
+        # id(websocket) -> payload key of the full tree the client last received
+        self.tree_keys: Dict[int, Tuple] = {}
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections[id(websocket)] = websocket
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        self.active_connections.pop(id(websocket), None)
+        self.tree_keys.pop(id(websocket), None)
+
+    def is_connected(self, websocket: WebSocket) -> bool:
+        return id(websocket) in self.active_connections
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         try:
-            if websocket in self.active_connections:
+            if self.is_connected(websocket):
                 await websocket.send_text(message)
         except Exception as e:
             print(f"Failed to send message to WebSocket: {e}")
             self.disconnect(websocket)
 
-    async def broadcast(self, message: str):
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                print(f"Failed to broadcast to connection: {e}")
-                disconnected.append(connection)
+    async def broadcast(self, message: str, connections: Optional[List[WebSocket]] = None):
+        # Send to all (or the given) clients concurrently so one slow client doesn't delay the rest
+        if connections is None:
+            connections = list(self.active_connections.values())
+        results = await asyncio.gather(
+            *(connection.send_text(message) for connection in connections),
+            return_exceptions=True
+        )
         
         # Remove broken connections
-        for conn in disconnected:
-            self.disconnect(conn)
+        for conn, result in zip(connections, results):
+            if isinstance(result, BaseException):
+                print(f"Failed to broadcast to connection: {result}")
+                self.disconnect(conn)
 
 manager = ConnectionManager()
 
@@ -167,19 +245,22 @@ def get_newest_database() -> Optional[str]:
         if not os.path.exists("db"):
             return None
             
-        db_files = []
-        for filename in os.listdir("db"):
-            if filename.startswith("investigation_") and filename.endswith(".db"):
-                filepath = os.path.join("db", filename)
-                mtime = os.path.getmtime(filepath)
-                db_files.append((filename, mtime))
-        
-        if not db_files:
+        newest_name = None
+        newest_mtime = None
+        with os.scandir("db") as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith("investigation_") and name.endswith(".db"):
+                    mtime = entry.stat().st_mtime
+                    # Later entries win ties, matching the previous sort order
+                    if newest_mtime is None or mtime >= newest_mtime:
+                        newest_name = name
+                        newest_mtime = mtime
+        
+        if newest_name is None:
             return None
             
-        # Sort by modification time and get the newest
-        latest_db = sorted(db_files, key=lambda x: x[1])[-1][0]
-        return f"db/{latest_db}"
+        return f"db/{newest_name}"
         
     except Exception as e:
         logger.error(f"Error finding newest database: {e}")
@@ -188,7 +269,7 @@ def get_newest_database() -> Optional[str]:
 async def auto_refresh_checker():
     """Background task that checks for newer databases and auto-refreshes"""
     global current_db_path, memory_tree
-    last_db_mtime = None
+    deferred_reloads = 0
     
     while True:
         try:
@@ -197,20 +278,22 @@ async def auto_refresh_checker():
             # Check if current database has been modified (new nodes added)
             if current_db_path and os.path.exists(current_db_path):
                 current_mtime = os.path.getmtime(current_db_path)
-                if last_db_mtime is None:
-                    last_db_mtime = current_mtime
-                elif current_mtime > last_db_mtime:
-                    logger.info(f"🔄 Current database {current_db_path} has been updated, reloading...")
-                    last_db_mtime = current_mtime
-                    
-                    # Reload the current database to pick up new nodes
-                    if memory_tree:
-                        memory_tree.load_from_database()
-                        logger.info(f"✅ Reloaded tree with {len(memory_tree.nodes)} nodes")
+                loaded_mtime = get_loaded_mtime(current_db_path)
+                if loaded_mtime is not None and current_mtime > loaded_mtime:
+                    # Wait for writes to settle, but not indefinitely under a steady stream of them
+                    settled = time.time() - current_mtime >= RELOAD_DEBOUNCE_SECONDS
+                    if not settled and deferred_reloads < RELOAD_MAX_DEFERRALS:
+                        deferred_reloads += 1
+                    else:
+                        deferred_reloads = 0
+                        logger.info(f"🔄 Current database {current_db_path} has been updated, reloading...")
                         
-                        # Broadcast update to all connected clients
-                        if manager.active_connections:
-                            await broadcast_tree_update()
+                        # Reload the current database to pick up new nodes
+                        if await reload_current_tree():
+                            logger.info(f"✅ Reloaded tree with {len(memory_tree.nodes)} nodes")
+                            
+                            # Broadcast update to all connected clients
+                            notify_tree_update()
             
             newest_db = get_newest_database()
             if newest_db and newest_db != current_db_path:
@@ -220,49 +303,79 @@ async def auto_refresh_checker():
                     logger.info(f"🕐 Database {newest_db} is too new ({db_age:.1f}s), waiting...")
                     continue
                 
-                # Test if the database has actual data
+                # Switch only if the database has actual data; otherwise the current one stays loaded
                 try:
-                    from tree import MemoryTree as TestTree
-                    test_tree = TestTree(newest_db)
-                    if not test_tree.root_id:
-                        logger.info(f"📭 Database {newest_db} has no root data, skipping")
-                        continue
-                    
-                    logger.info(f"🔄 Auto-refresh: Switching to populated database {newest_db}")
+                    logger.info(f"🔄 Auto-refresh: Switching to database {newest_db}")
                     old_db = current_db_path
-                    initialize_system()
+                    await reload_system(require_root=True)
                     
                     if current_db_path != old_db:
                         logger.info(f"✅ Successfully switched from {old_db} to {current_db_path}")
                         
-                        # Reset modification time tracking for new database
-                        last_db_mtime = os.path.getmtime(current_db_path) if os.path.exists(current_db_path) else None
-                        
                         # Broadcast update to all connected clients
                         if manager.active_connections:
-                            await manager.broadcast(json.dumps({
+                            await manager.broadcast(dumps_json({
                                 "type": "database_refresh",
                                 "message": f"Switched to newer database: {newest_db}",
                                 "old_db": old_db,
                                 "new_db": current_db_path
                             }))
                             
-                            # Send immediate tree update
-                            await broadcast_tree_update()
-                    else:
-                        logger.info(f"🔄 Already using the newest database: {current_db_path}")
+                        # Send immediate tree update
+                        notify_tree_update()
                         
                 except Exception as e:
-                    logger.error(f"❌ Error testing database {newest_db}: {e}")
+                    logger.error(f"❌ Error switching to database {newest_db}: {e}")
                     continue
                     
         except Exception as e:
             logger.error(f"Error in auto-refresh checker: {e}")
             await asyncio.sleep(10)
 
-def initialize_system():
-    """Initialize the memory tree and task queue"""
-    global memory_tree, task_queue, current_db_path
+def notify_tree_update():
+    """Wake the broadcaster so connected clients receive the current tree"""
+    if tree_update_event is not None:
+        tree_update_event.set()
+
+async def tree_broadcaster():
+    """Background task that pushes tree updates to clients whenever the tree changes"""
+    while True:
+        try:
+            await tree_update_event.wait()
+            tree_update_event.clear()
+            # Runs without clients too, so the patch baseline follows every tree change
+            await broadcast_tree_update()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in tree broadcaster: {e}")
+
+def get_task_database(db_path: str) -> Optional[str]:
+    """Find the task queue database saved alongside an investigation database"""
+    filename = os.path.basename(db_path)
+    timestamp = filename.replace("investigation_", "").replace(".db", "")
+    task_db = f"db/tasks_{timestamp}.db"
+    return task_db if os.path.exists(task_db) else None
+
+def get_db_file_state(*paths: str) -> Tuple:
+    """Snapshot the modification times of database files"""
+    return tuple((path, os.path.getmtime(path) if os.path.exists(path) else None) for path in paths)
+
+def get_loaded_mtime(path: str) -> Optional[float]:
+    """Modification time of a database file as of its last load, if it is loaded"""
+    return dict(loaded_db_state or ()).get(path)
+
+def set_loaded_mtime(path: str, mtime: float):
+    """Record that a loaded database file was reloaded as of mtime"""
+    global loaded_db_state
+    if loaded_db_state is not None:
+        loaded_db_state = tuple((loaded_path, mtime if loaded_path == path else loaded_mtime)
+                                for loaded_path, loaded_mtime in loaded_db_state)
+
+def initialize_system(require_root: bool = False):
+    """Initialize the memory tree and task queue, keeping the current ones if require_root and the newest tree is empty"""
+    global memory_tree, task_queue, current_db_path, loaded_db_state
+    previous_tree = memory_tree
     
     try:
         logger.info(f"🔄 Initializing system (current_db: {current_db_path})")
@@ -271,18 +384,28 @@ def initialize_system():
         
         # Find the most recent database files
         newest_db = get_newest_database()
+        task_db = get_task_database(newest_db) if newest_db else None
+        db_path = newest_db or "db/memory_tree.db"
+        db_state = get_db_file_state(db_path, task_db or "db/task_queue.db")
+        
+        # Keep the loaded instances while their database files are unchanged
+        if memory_tree is not None and task_queue is not None and db_state == loaded_db_state:
+            logger.info(f"✅ Database {current_db_path} unchanged, keeping loaded tree and task queue")
+            return
         
         if newest_db:
             # Use the most recent investigation database
+            logger.info(f"📊 Loading database: {newest_db}")
+            new_tree = MemoryTree(newest_db)
+            if require_root and not new_tree.root_id:
+                logger.info(f"📭 Database {newest_db} has no root data, skipping")
+                new_tree.close()
+                return
             current_db_path = newest_db
-            logger.info(f"📊 Loading database: {current_db_path}")
-            memory_tree = MemoryTree(current_db_path)
+            memory_tree = new_tree
             
             # Find corresponding task queue
-            filename = os.path.basename(current_db_path)
-            timestamp = filename.replace("investigation_", "").replace(".db", "")
-            task_db = f"db/tasks_{timestamp}.db"
-            if os.path.exists(task_db):
+            if task_db:
                 task_queue = TaskQueue(task_db)
                 logger.info(f"📋 Loading task queue: {task_db}")
             else:
@@ -294,6 +417,13 @@ def initialize_system():
             current_db_path = "db/memory_tree.db"
             memory_tree = MemoryTree(current_db_path)
             task_queue = TaskQueue("db/task_queue.db")
+        
+        # Use the snapshot taken before loading, so writes landing mid-load trigger the next reload;
+        # a file that didn't exist was created empty by the load, so its state is taken now
+        loaded_db_state = tuple(
+            (path, mtime) if mtime is not None else get_db_file_state(path)[0]
+            for path, mtime in db_state
+        )
             
         # Verify the tree has data
         if memory_tree and hasattr(memory_tree, 'root_id') and memory_tree.root_id:
@@ -304,32 +434,174 @@ def initialize_system():
                 logger.warning("⚠️ Memory tree has root_id but no root node found")
         else:
             logger.warning("⚠️ Memory tree has no root_id")
+        
+        # Release the replaced tree's database connection
+        if previous_tree is not None and previous_tree is not memory_tree:
+            previous_tree.close()
             
     except Exception as e:
         logger.error(f"❌ Error initializing system: {e}")
         # Create minimal fallback instances
+        if memory_tree is not None and memory_tree is not previous_tree:
+            memory_tree.close()
+        if previous_tree is not None:
+            previous_tree.close()
         memory_tree = None
         task_queue = None
+        loaded_db_state = None
 
-def convert_node_to_dict(node: MemoryNode, include_children: bool = True) -> Dict[str, Any]:
-    """Convert a MemoryNode to a dictionary for JSON serialization"""
+async def reload_system(require_root: bool = False):
+    """Run initialize_system on a worker thread so database loads don't stall the event loop"""
+    async with system_init_lock:
+        await asyncio.to_thread(initialize_system, require_root)
+
+async def reload_current_tree() -> bool:
+    """Reload the served tree from its database on a worker thread, under the same lock as reload_system"""
+    global memory_tree
+    async with system_init_lock:
+        if memory_tree is None or not current_db_path:
+            return False
+        
+        # Snapshot first, so writes landing mid-load trigger the next reload
+        db_mtime = os.path.getmtime(current_db_path)
+        # Load into a new tree so requests keep reading the complete old one meanwhile
+        new_tree = await asyncio.to_thread(MemoryTree, current_db_path)
+        previous_tree, memory_tree = memory_tree, new_tree
+        set_loaded_mtime(current_db_path, db_mtime)
+        previous_tree.close()
+        return True
+
+def node_fields_to_dict(node: MemoryNode) -> Dict[str, Any]:
+    """Convert a MemoryNode's own fields to a dictionary, with an empty children list"""
     return {
         "id": node.id,
         "name": node.name,
         "description": node.description,
         "status": node.status.value if hasattr(node.status, 'value') else str(node.status),
-        "created_at": node.created_at.isoformat() if hasattr(node.created_at, 'isoformat') else str(node.created_at),
-        "children": [
-            convert_node_to_dict(memory_tree.get_node(child_id), include_children=True) 
-            for child_id in node.children_ids 
-            if memory_tree.get_node(child_id)
-        ] if include_children else []
+        "created_at": node.created_at_iso,
+        "children": []
     }
 
+def convert_node_to_dict(node: MemoryNode, include_children: bool = True,
+                         node_map: Optional[Dict[str, MemoryNode]] = None) -> Dict[str, Any]:
+    """Convert a MemoryNode to a dictionary for JSON serialization"""
+    node_dict = node_fields_to_dict(node)
+    if not include_children:
+        return node_dict
+    
+    # Walk the tree's node map with an explicit stack so deep trees can't overflow the call stack;
+    # each child dict is attached to its parent as it is created, keeping children in order
+    if node_map is None:
+        node_map = memory_tree.nodes
+    expanded = {node.id}
+    stack = [(node, node_dict)]
+    while stack:
+        current, current_dict = stack.pop()
+        for child_id in current.children_ids:
+            child = node_map.get(child_id)
+            if child:
+                child_dict = node_fields_to_dict(child)
+                current_dict["children"].append(child_dict)
+                # A node reached twice (a corrupt, cyclic tree) is listed without its children again
+                if child_id not in expanded:
+                    expanded.add(child_id)
+                    stack.append((child, child_dict))
+    
+    return node_dict
+
+def flatten_tree_dict(tree_dict: Dict[str, Any]) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Flatten a converted tree into node ID -> fields with child IDs, or None if a node repeats"""
+    flat_nodes = {}
+    stack = [tree_dict]
+    while stack:
+        node_dict = stack.pop()
+        if node_dict["id"] in flat_nodes:
+            return None
+        entry = {key: value for key, value in node_dict.items() if key != "children"}
+        entry["child_ids"] = [child["id"] for child in node_dict["children"]]
+        flat_nodes[node_dict["id"]] = entry
+        stack.extend(node_dict["children"])
+    return flat_nodes
+
+def refresh_tree_payload() -> Tuple:
+    """Get the cached tree payload, re-encoding only after the tree or task queue changes"""
+    global tree_payload_cache
+    cache_key = (
+        memory_tree, memory_tree.version if memory_tree else None,
+        task_queue, task_queue.version if task_queue else None
+    )
+    if tree_payload_cache is not None and tree_payload_cache[0] == cache_key:
+        return tree_payload_cache
+    
+    tree_json = None
+    stats_json = dumps_json(EMPTY_TREE_STATS)
+    flat_nodes = None
+    if memory_tree:
+        stats_data = memory_tree.get_tree_statistics()
+        stats_data["task_stats"] = task_queue.get_queue_statistics() if task_queue else {}
+        stats_json = dumps_json(stats_data)
+        root_node = memory_tree.get_node(memory_tree.root_id) if memory_tree.root_id else None
+        if root_node:
+            tree_dict = convert_node_to_dict(root_node)
+            tree_json = dumps_json(tree_dict)
+            flat_nodes = flatten_tree_dict(tree_dict)
+    
+    tree_payload_cache = (cache_key, tree_json, stats_json, flat_nodes)
+    return tree_payload_cache
+
+def get_encoded_tree_payload() -> Tuple[Optional[str], str]:
+    """Get the tree and stats as JSON, re-encoding only after the tree or task queue changes"""
+    _, tree_json, stats_json, _ = refresh_tree_payload()
+    return tree_json, stats_json
+
+def build_tree_patch(previous_nodes: Dict[str, Dict[str, Any]],
+                     current_nodes: Dict[str, Dict[str, Any]]) -> Dict[str, List]:
+    """Diff two flat trees into added, updated and removed nodes"""
+    patch = {"added": [], "updated": [], "removed": []}
+    for node_id, entry in current_nodes.items():
+        previous = previous_nodes.get(node_id)
+        if previous is None:
+            patch["added"].append(entry)
+        elif previous != entry:
+            patch["updated"].append(entry)
+    patch["removed"] = [node_id for node_id in previous_nodes if node_id not in current_nodes]
+    return patch
+
+def encode_tree_patch(root_id: str, patch: Dict[str, List], stats_json: str) -> str:
+    """Wrap a tree patch and pre-encoded stats JSON in a tree_patch message"""
+    fields = [
+        f'"root_id":{dumps_json(root_id)}',
+        f'"added":{dumps_json(patch["added"])}',
+        f'"updated":{dumps_json(patch["updated"])}',
+        f'"removed":{dumps_json(patch["removed"])}',
+        f'"stats":{stats_json}',
+        f'"timestamp":{dumps_json(datetime.now().isoformat())}'
+    ]
+    return '{"type":"tree_patch","data":{' + ','.join(fields) + '}}'
+
+def encode_tree_update(tree_json: Optional[str], stats_json: str, source: Optional[str] = None) -> str:
+    """Wrap pre-encoded tree and stats JSON in a tree_update message"""
+    # Matches dumps_json output for the equivalent dict without re-encoding the tree
+    fields = [
+        f'"tree":{tree_json if tree_json is not None else "null"}',
+        f'"stats":{stats_json}',
+        f'"timestamp":{dumps_json(datetime.now().isoformat())}'
+    ]
+    if source is not None:
+        fields.append(f'"source":{dumps_json(source)}')
+    return '{"type":"tree_update","data":{' + ','.join(fields) + '}}'
+
+def encoded_data_response(data_json: str, message: str) -> Response:
+    """Build a {"data", "message"} JSON response around pre-encoded data"""
+    return Response(
+        content='{"data":' + data_json + ',"message":' + dumps_json(message) + '}',
+        media_type="application/json"
+    )
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize the system on startup"""
-    global auto_refresh_task
+    global auto_refresh_task, tree_broadcast_task, tree_update_event
     try:
         initialize_system()
         
@@ -337,6 +609,11 @@ async def startup_event():
         auto_refresh_task = asyncio.create_task(auto_refresh_checker())
         print("🔄 Auto-refresh task started")
         
+        # Start the event-driven tree broadcaster
+        tree_update_event = asyncio.Event()
+        tree_broadcast_task = asyncio.create_task(tree_broadcaster())
+        print("📡 Tree broadcaster started")
+        
         print("✅ API server initialized successfully")
     except Exception as e:
         print(f"❌ Error initializing API server: {e}")
@@ -344,7 +621,7 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
-    global auto_refresh_task
+    global auto_refresh_task, tree_broadcast_task
     if auto_refresh_task:
         auto_refresh_task.cancel()
         try:
@@ -352,6 +629,13 @@ async def shutdown_event():
         except asyncio.CancelledError:
             pass
         print("🛑 Auto-refresh task stopped")
+    if tree_broadcast_task:
+        tree_broadcast_task.cancel()
+        try:
+            await tree_broadcast_task
+        except asyncio.CancelledError:
+            pass
+        print("🛑 Tree broadcaster stopped")
 
 @app.get("/")
 async def root():
@@ -372,7 +656,7 @@ async def get_tree():
     """Get the complete memory tree"""
     try:
         if not memory_tree or not memory_tree.root_id:
-            return JSONResponse(
+            return APIJSONResponse(
                 status_code=200,
                 content={
                     "data": None,
@@ -380,9 +664,10 @@ async def get_tree():
                 }
             )
         
-        root_node = memory_tree.get_node(memory_tree.root_id)
-        if not root_node:
-            return JSONResponse(
+        # Reuse the encoded tree until the tree changes
+        tree_json, _ = get_encoded_tree_payload()
+        if tree_json is None:
+            return APIJSONResponse(
                 status_code=200,
                 content={
                     "data": None,
@@ -390,15 +675,7 @@ async def get_tree():
                 }
             )
         
-        tree_data = convert_node_to_dict(root_node)
-        
-        return JSONResponse(
-            status_code=200,
-            content={
-                "data": tree_data,
-                "message": "Tree data retrieved successfully"
-            }
-        )
+        return encoded_data_response(tree_json, "Tree data retrieved successfully")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving tree: {str(e)}")
@@ -408,7 +685,7 @@ async def get_tree_stats():
     """Get tree statistics"""
     try:
         if not memory_tree:
-            return JSONResponse(
+            return APIJSONResponse(
                 status_code=200,
                 content={
                     "data": {
@@ -420,23 +697,10 @@ async def get_tree_stats():
                 }
             )
         
-        stats = memory_tree.get_tree_statistics()
-        
-        # Also get task queue stats if available
-        task_stats = {}
-        if task_queue:
-            task_stats = task_queue.get_queue_statistics()
+        # Tree and task queue stats are encoded once per change
+        _, stats_json = get_encoded_tree_payload()
         
-        return JSONResponse(
-            status_code=200,
-            content={
-                "data": {
-                    **stats,
-                    "task_stats": task_stats
-                },
-                "message": "Statistics retrieved successfully"
-            }
-        )
+        return encoded_data_response(stats_json, "Statistics retrieved successfully")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving stats: {str(e)}")
@@ -454,17 +718,14 @@ async def get_node(node_id: str):
         
         node_data = convert_node_to_dict(node, include_children=False)
         
-        # Add additional context
-        siblings = memory_tree.get_siblings(node_id)
-        path_to_root = memory_tree.get_path_to_root(node_id)
-        
-        return JSONResponse(
+        # Add additional context; the tree keeps node depths current, so no walk to the root
+        return APIJSONResponse(
             status_code=200,
             content={
                 "data": {
                     **node_data,
-                    "siblings_count": len(siblings),
-                    "depth_from_root": len(path_to_root) - 1,
+                    "siblings_count": memory_tree.count_siblings(node_id),
+                    "depth_from_root": node.depth,
                     "has_children": len(node.children_ids) > 0
                 },
                 "message": "Node details retrieved successfully"
@@ -479,7 +740,7 @@ async def get_job_tree(job_id: str):
     """Get memory tree specific to a job"""
     try:
         if not memory_tree or not memory_tree.root_id:
-            return JSONResponse(
+            return APIJSONResponse(
                 status_code=200,
                 content={
                     "data": None,
@@ -489,9 +750,9 @@ async def get_job_tree(job_id: str):
         
         # For now, we'll return the global tree since jobs aren't yet stored separately
         # In the future, this could be enhanced to store job-specific trees
-        root_node = memory_tree.get_node(memory_tree.root_id)
-        if not root_node:
-            return JSONResponse(
+        tree_json, _ = get_encoded_tree_payload()
+        if tree_json is None:
+            return APIJSONResponse(
                 status_code=200,
                 content={
                     "data": None,
@@ -501,14 +762,8 @@ async def get_job_tree(job_id: str):
         
         # For job-specific filtering, we could filter by creation time or job metadata
         # For now, we'll return the full tree as it represents the most recent job
-        tree_data = convert_node_to_dict(root_node)
-        
-        return JSONResponse(
-            status_code=200,
-            content={
-                "data": tree_data,
-                "message": f"Job-specific tree data retrieved successfully for job: {job_id}"
-            }
+        return encoded_data_response(
+            tree_json, f"Job-specific tree data retrieved successfully for job: {job_id}"
         )
         
     except Exception as e:
@@ -519,7 +774,7 @@ async def get_job_tree_stats(job_id: str):
     """Get tree statistics specific to a job"""
     try:
         if not memory_tree:
-            return JSONResponse(
+            return APIJSONResponse(
                 status_code=200,
                 content={
                     "data": {
@@ -542,7 +797,7 @@ async def get_job_tree_stats(job_id: str):
             task_stats = task_queue.get_queue_statistics()
             stats["task_stats"] = task_stats
         
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=200,
             content={
                 "data": stats,
@@ -558,7 +813,7 @@ async def get_tasks():
     """Get task queue information"""
     try:
         if not task_queue:
-            return JSONResponse(
+            return APIJSONResponse(
                 status_code=200,
                 content={
                     "data": {
@@ -572,16 +827,16 @@ async def get_tasks():
             )
         
         pending_tasks = [task.to_dict() for task in task_queue.get_pending_tasks()]
-        completed_tasks = [task.to_dict() for task in task_queue.get_completed_tasks()]
+        completed_tasks = [task.to_dict() for task in task_queue.get_completed_tasks(limit=10)]
         failed_tasks = [task.to_dict() for task in task_queue.get_failed_tasks()]
         stats = task_queue.get_queue_statistics()
         
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=200,
             content={
                 "data": {
                     "pending": pending_tasks,
-                    "completed": completed_tasks[-10:],  # Last 10 completed
+                    "completed": completed_tasks,  # Last 10 completed
                     "failed": failed_tasks,
                     "stats": stats
                 },
@@ -596,8 +851,9 @@ async def get_tasks():
 async def refresh_data():
     """Refresh/reload the tree and task data"""
     try:
-        initialize_system()
-        return JSONResponse(
+        await reload_system()
+        notify_tree_update()
+        return APIJSONResponse(
             status_code=200,
             content={
                 "message": "Data refreshed successfully",
@@ -625,7 +881,7 @@ async def get_system_status():
         if task_queue:
             status["task_stats"] = task_queue.get_queue_statistics()
         
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=200,
             content={
                 "data": status,
@@ -663,7 +919,7 @@ async def upload_file(file: UploadFile = File(...)):
         logger.info(f"📁 Uploaded file: {file.filename} ({file.size} bytes)")
         logger.info(f"📋 Current session files: {current_session_files}")
         
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=200,
             content={
                 "message": f"File '{file.filename}' uploaded successfully",
@@ -685,7 +941,7 @@ async def upload_and_analyze(files: List[UploadFile] = File(...)):
     
     try:
         if analysis_running:
-            return JSONResponse(
+            return APIJSONResponse(
                 status_code=409,
                 content={"message": "Analysis already running. Please wait for it to complete."}
             )
@@ -732,7 +988,7 @@ async def upload_and_analyze(files: List[UploadFile] = File(...)):
         # Run analysis in background
         asyncio.create_task(run_analysis_background())
         
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=202,
             content={
                 "message": f"{len(uploaded_files)} files uploaded and analysis started",
@@ -776,7 +1032,7 @@ async def upload_multiple_files(files: List[UploadFile] = File(...)):
             
             logger.info(f"📁 Uploaded file: {file.filename} ({file.size} bytes)")
         
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=200,
             content={
                 "message": f"Successfully uploaded {len(uploaded_files)} files",
@@ -794,7 +1050,7 @@ async def list_case_files():
     try:
         case_files_dir = Path("case_files")
         if not case_files_dir.exists():
-            return JSONResponse(
+            return APIJSONResponse(
                 status_code=200,
                 content={"files": [], "message": "No case files directory found"}
             )
@@ -809,7 +1065,7 @@ async def list_case_files():
                 "path": str(file_path)
             })
         
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=200,
             content={"files": files, "count": len(files)}
         )
@@ -829,7 +1085,7 @@ async def delete_case_file(filename: str):
         file_path.unlink()
         logger.info(f"🗑️ Deleted file: {filename}")
         
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=200,
             content={"message": f"File '{filename}' deleted successfully"}
         )
@@ -847,7 +1103,7 @@ async def start_document_analysis(request: Optional[AnalysisRequest] = None):
     
     try:
         if analysis_running:
-            return JSONResponse(
+            return APIJSONResponse(
                 status_code=409,
                 content={"message": "Analysis is already running", "status": "running"}
             )
@@ -909,7 +1165,7 @@ async def start_document_analysis(request: Optional[AnalysisRequest] = None):
         # Run analysis in background
         asyncio.create_task(run_analysis_background())
         
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=202,
             content={
                 "message": "Document analysis started successfully",
@@ -942,7 +1198,7 @@ async def run_analysis_background():
             return
         
         # Broadcast start message
-        await manager.broadcast(json.dumps({
+        await manager.broadcast(dumps_json({
             "type": "analysis_status",
             "data": {
                 "status": "running",
@@ -964,7 +1220,7 @@ async def run_analysis_background():
         logger.info(f"✅ Analysis summary generated and stored: {len(analysis_summary.get('key_findings', []))} findings")
         
         # Broadcast completion message with summary
-        await manager.broadcast(json.dumps({
+        await manager.broadcast(dumps_json({
             "type": "analysis_completed", 
             "data": {
                 "status": "completed",
@@ -986,7 +1242,7 @@ async def run_analysis_background():
         traceback.print_exc()
         
         # Broadcast error message
-        await manager.broadcast(json.dumps({
+        await manager.broadcast(dumps_json({
             "type": "analysis_status",
             "data": {
                 "status": "error",
@@ -1008,7 +1264,7 @@ async def get_analysis_status():
     try:
         status = "running" if analysis_running else "idle"
         
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=200,
             content={
                 "status": status,
@@ -1042,7 +1298,7 @@ async def get_analysis_summary():
                     last_analysis_summary = enhanced_summary
                     logger.info("📊 Enhanced analysis summary generated using SummarizationAgent")
                     
-                    return JSONResponse(
+                    return APIJSONResponse(
                         status_code=200,
                         content={
                             "summary": enhanced_summary,
@@ -1058,12 +1314,12 @@ async def get_analysis_summary():
         
         # Fallback to existing summary
         if not last_analysis_summary:
-            return JSONResponse(
+            return APIJSONResponse(
                 status_code=404,
                 content={"message": "No analysis summary available. Please run an analysis first."}
             )
         
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=200,
             content={
                 "summary": last_analysis_summary,
@@ -1084,7 +1340,7 @@ async def clear_session():
     
     try:
         if analysis_running:
-            return JSONResponse(
+            return APIJSONResponse(
                 status_code=409,
                 content={"message": "Cannot clear session while analysis is running"}
             )
@@ -1095,7 +1351,7 @@ async def clear_session():
         
         logger.info(f"🗑️ Cleared session files: {old_files}")
         
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=200,
             content={
                 "message": "Session cleared successfully",
@@ -1122,70 +1378,30 @@ async def websocket_endpoint(websocket: WebSocket):
                 "message": "WebSocket connection established"
             }
         }
-        await manager.send_personal_message(json.dumps(initial_message), websocket)
+        await manager.send_personal_message(dumps_json(initial_message), websocket)
         
-        # Send real data every 5 seconds
-        while websocket in manager.active_connections:
+        # Send the current tree right away; later updates come from the broadcaster
+        tree_json = None
+        stats_json = dumps_json(EMPTY_TREE_STATS)
+        if memory_tree and memory_tree.root_id:
             try:
-                await asyncio.sleep(5)
-                
-                # Double-check connection is still active
-                if websocket not in manager.active_connections:
-                    print("WebSocket no longer in active connections, exiting loop")
-                    break
-                
-                print(f"📡 Preparing real-time update (active connections: {len(manager.active_connections)})")
-                
-                # Get real tree and stats data
-                tree_data = None
-                stats_data = {
-                    "total_nodes": 0,
-                    "max_depth": 0,
-                    "nodes_by_status": {"pending": 0, "in_progress": 0, "completed": 0, "failed": 0}
-                }
-                
-                if memory_tree and hasattr(memory_tree, 'root_id') and memory_tree.root_id:
-                    try:
-                        print(f"🌳 Getting root node: {memory_tree.root_id}")
-                        root_node = memory_tree.get_node(memory_tree.root_id)
-                        if root_node:
-                            print(f"✅ Converting tree data for node: {root_node.name}")
-                            tree_data = convert_node_to_dict(root_node)
-                            stats_data = memory_tree.get_tree_statistics()
-                            print(f"📊 Tree stats: {stats_data}")
-                            
-                            # Include task stats if available
-                            if task_queue and hasattr(task_queue, 'get_queue_statistics'):
-                                task_stats = task_queue.get_queue_statistics()
-                                stats_data["task_stats"] = task_stats
-                                print(f"📋 Task stats: {task_stats}")
-                        else:
-                            print("⚠️ Root node not found")
-                    except Exception as e:
-                        print(f"❌ Error getting tree data: {e}")
-                        import traceback
-                        traceback.print_exc()
-                else:
-                    print("⚠️ No memory tree or root_id available")
-                
-                # Send update with real data
-                update_message = {
-                    "type": "tree_update", 
-                    "data": {
-                        "tree": tree_data,
-                        "stats": stats_data,
-                        "timestamp": datetime.now().isoformat(),
-                        "source": "real_database" if tree_data else "empty_database"
-                    }
-                }
-                
-                await manager.send_personal_message(json.dumps(update_message), websocket)
-                print(f"✅ WebSocket update sent successfully (tree_data: {'present' if tree_data else 'none'})")
-                
+                payload_key, tree_json, stats_json, _ = refresh_tree_payload()
+                if tree_json is not None:
+                    # Recorded with the send, so the broadcaster knows which tree this client holds
+                    manager.tree_keys[id(websocket)] = payload_key
             except Exception as e:
-                print(f"❌ WebSocket update loop error: {e}")
-                import traceback
-                traceback.print_exc()
+                print(f"❌ Error getting tree data: {e}")
+        await manager.send_personal_message(encode_tree_update(
+            tree_json, stats_json,
+            source="real_database" if tree_json is not None else "empty_database"
+        ), websocket)
+        
+        # Wait for the client to go away; incoming messages are ignored
+        while manager.is_connected(websocket):
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                print("WebSocket client disconnected")
+                manager.disconnect(websocket)
                 break
             
     except WebSocketDisconnect:
@@ -1197,29 +1413,46 @@ async def websocket_endpoint(websocket: WebSocket):
 
 async def broadcast_tree_update():
     """Broadcast tree updates to all connected clients"""
+    global broadcast_tree_nodes
     if not memory_tree or not memory_tree.root_id:
+        broadcast_tree_nodes = None
         return
         
-    root_node = memory_tree.get_node(memory_tree.root_id)
-    if not root_node:
+    payload_key, tree_json, stats_json, flat_nodes = refresh_tree_payload()
+    if tree_json is None:
+        broadcast_tree_nodes = None
         return
-        
-    tree_data = convert_node_to_dict(root_node)
-    stats_data = memory_tree.get_tree_statistics()
     
-    if task_queue:
-        stats_data["task_stats"] = task_queue.get_queue_statistics()
+    root_id = memory_tree.root_id
+    baseline = broadcast_tree_nodes
+    broadcast_tree_nodes = (payload_key, root_id, flat_nodes) if flat_nodes is not None else None
+    if not manager.active_connections:
+        return
     
-    update_message = {
-        "type": "tree_update",
-        "data": {
-            "tree": tree_data,
-            "stats": stats_data,
-            "timestamp": datetime.now().isoformat()
-        }
-    }
+    # A patch only brings a client up to date from the exact baseline tree: a node added and
+    # removed again since then, or a field changed and reverted, would never be resent
+    patch_message = None
+    if flat_nodes is not None and baseline is not None and baseline[1] == root_id:
+        patch = build_tree_patch(baseline[2], flat_nodes)
+        changed_count = len(patch["added"]) + len(patch["updated"]) + len(patch["removed"])
+        if changed_count * 2 < len(flat_nodes):
+            patch_message = encode_tree_patch(root_id, patch, stats_json)
+    
+    # Clients that connected (or reconnected) since the baseline get the full tree instead
+    patched, full = [], []
+    for connection_id, websocket in manager.active_connections.items():
+        if patch_message is not None and manager.tree_keys.get(connection_id) == baseline[0]:
+            patched.append(websocket)
+        else:
+            full.append(websocket)
+        manager.tree_keys[connection_id] = payload_key
     
-    await manager.broadcast(json.dumps(update_message))
+    sends = []
+    if patched:
+        sends.append(manager.broadcast(patch_message, patched))
+    if full:
+        sends.append(manager.broadcast(encode_tree_update(tree_json, stats_json), full))
+    await asyncio.gather(*sends)
 
 if __name__ == "__main__":
     print("🚀 Starting AI Agent Memory Tree API Server...")
@@ -1227,10 +1460,17 @@ if __name__ == "__main__":
     print("🌳 Tree Endpoint: http://localhost:8000/api/tree")
     print("📈 Stats Endpoint: http://localhost:8000/api/tree/stats")
     
+    # Auto-reload is for development; set API_RELOAD=false to serve without the file watcher.
+    # A single worker is required: the tree, task queue and WebSocket clients live in this process.
+    # loop/http "auto" pick uvloop and httptools whenever they are installed.
+    reload = os.getenv("API_RELOAD", "true").lower() != "false"
     uvicorn.run(
         "api_server:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=reload,
+        workers=1,
+        loop="auto",
+        http="auto",
         log_level="info"
     ) 
\ No newline at end of file
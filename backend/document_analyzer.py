@@ -6,6 +6,7 @@ for analysis by the AI agents.
 """
 
 import os
+import re
 import glob
 from pathlib import Path
 from typing import List, Dict, Any
@@ -13,6 +14,14 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Entity patterns used when scanning case documents line by line
+PHONE_RE = re.compile(r'\(\d{3}\) \d{3}-\d{4}')
+DATE_RE = re.compile(
+    r'(?:January|February|March|April|May|June|July|August|September|October|November|December)'
+    r' \d{1,2}, \d{4}'
+)
+TIME_RE = re.compile(r'\d{1,2}:\d{2}(?:\s?(?:AM|PM|hours))?', re.IGNORECASE)
+
 
 class DocumentAnalyzer:
     """Handles reading and preprocessing case documents"""
@@ -193,35 +202,13 @@ class DocumentAnalyzer:
                 entities['addresses'].append(line.strip())
             
             # Extract phone numbers (simple pattern)
-            import re
-            phone_pattern = r'\(\d{3}\) \d{3}-\d{4}'
-            phones = re.findall(phone_pattern, line)
-            entities['phone_numbers'].extend(phones)
+            entities['phone_numbers'].extend(PHONE_RE.findall(line))
             
             # Extract dates (simple patterns)
-            date_patterns = [
-                r'January \d{1,2}, \d{4}',
-                r'February \d{1,2}, \d{4}',
-                r'March \d{1,2}, \d{4}',
-                r'April \d{1,2}, \d{4}',
-                r'May \d{1,2}, \d{4}',
-                r'June \d{1,2}, \d{4}',
-                r'July \d{1,2}, \d{4}',
-                r'August \d{1,2}, \d{4}',
-                r'September \d{1,2}, \d{4}',
-                r'October \d{1,2}, \d{4}',
-                r'November \d{1,2}, \d{4}',
-                r'December \d{1,2}, \d{4}'
-            ]
-            
-            for pattern in date_patterns:
-                dates = re.findall(pattern, line)
-                entities['dates'].extend(dates)
+            entities['dates'].extend(DATE_RE.findall(line))
             
             # Extract times
-            time_pattern = r'\d{1,2}:\d{2}(?:\s?(?:AM|PM|hours))?'
-            times = re.findall(time_pattern, line, re.IGNORECASE)
-            entities['times'].extend(times)
+            entities['times'].extend(TIME_RE.findall(line))
         
         # Remove duplicates
         for key in entities:
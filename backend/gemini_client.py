@@ -1,5 +1,6 @@
 import os
 import time
+import asyncio
 import logging
 from google import genai
 from dotenv import load_dotenv
@@ -51,12 +52,8 @@ class GeminiClient:
                 return response.text
                 
             except Exception as e:
-                error_message = str(e).lower()
-                
                 # Check for rate limit errors
-                if any(keyword in error_message for keyword in [
-                    'rate limit', 'quota', 'too many requests', 'rate_limit_exceeded'
-                ]):
+                if self._is_rate_limit_error(e):
                     if attempt < self.max_retries:
                         logger.warning(f"Rate limit hit. Attempt {attempt + 1}/{self.max_retries + 1}. Retrying in {self.retry_delay} seconds...")
                         time.sleep(self.retry_delay)
@@ -71,6 +68,88 @@ class GeminiClient:
         
         # This should never be reached, but just in case
         raise Exception("Unexpected error in retry loop")
+    
+    async def generate_content_async(self, model: str = "gemini-2.0-flash", contents: str = "", **kwargs):
+        """
+        Async variant of generate_content that does not block the event loop
+        
+        Args:
+            model: Model name to use
+            contents: Content/prompt to send
+            **kwargs: Additional parameters for the API call
+            
+        Returns:
+            Generated response text
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.client.aio.models.generate_content(
+                    model=model,
+                    contents=contents,
+                    **kwargs
+                )
+                return response.text
+                
+            except Exception as e:
+                if self._is_rate_limit_error(e):
+                    if attempt < self.max_retries:
+                        logger.warning(f"Rate limit hit. Attempt {attempt + 1}/{self.max_retries + 1}. Retrying in {self.retry_delay} seconds...")
+                        await asyncio.sleep(self.retry_delay)
+                        continue
+                    else:
+                        logger.error(f"Rate limit exceeded after {self.max_retries} retries")
+                        raise Exception(f"Rate limit exceeded after {self.max_retries} retries") from e
+                
+                logger.error(f"API error: {e}")
+                raise e
+        
+        raise Exception("Unexpected error in retry loop")
+    
+    async def generate_content_stream_async(self, model: str = "gemini-2.0-flash", contents: str = "", **kwargs):
+        """
+        Stream generated text as it arrives, retrying rate limits before the stream opens
+        
+        Args:
+            model: Model name to use
+            contents: Content/prompt to send
+            **kwargs: Additional parameters for the API call
+            
+        Yields:
+            Generated response text chunks
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                stream = await self.client.aio.models.generate_content_stream(
+                    model=model,
+                    contents=contents,
+                    **kwargs
+                )
+                break
+                
+            except Exception as e:
+                if self._is_rate_limit_error(e):
+                    if attempt < self.max_retries:
+                        logger.warning(f"Rate limit hit. Attempt {attempt + 1}/{self.max_retries + 1}. Retrying in {self.retry_delay} seconds...")
+                        await asyncio.sleep(self.retry_delay)
+                        continue
+                    else:
+                        logger.error(f"Rate limit exceeded after {self.max_retries} retries")
+                        raise Exception(f"Rate limit exceeded after {self.max_retries} retries") from e
+                
+                logger.error(f"API error: {e}")
+                raise e
+        
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+    
+    @staticmethod
+    def _is_rate_limit_error(error: Exception) -> bool:
+        """Check whether an API error is a rate limit / quota error"""
+        error_message = str(error).lower()
+        return any(keyword in error_message for keyword in [
+            'rate limit', 'quota', 'too many requests', 'rate_limit_exceeded'
+        ])
 
 # Create a default client instance
 def get_client():
@@ -1,8 +1,10 @@
 import json
 import sqlite3
+from collections import Counter
 from datetime import datetime, timedelta
+from itertools import islice
 from enum import Enum
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, List, Optional, Any, Set, Tuple
 from uuid import uuid4
 from pathlib import Path
 
@@ -130,6 +132,8 @@ class TaskQueue:
         self.completed_tasks: List[str] = []
         self.failed_tasks: List[str] = []
         self.db_path = db_path
+        self.version: int = 0  # Bumped on every mutation so caches can detect changes
+        self._stats_cache: Optional[Tuple[int, Dict[str, int]]] = None  # (version, statistics)
         self._init_database()
         self.load_from_database()
     
@@ -164,10 +168,24 @@ class TaskQueue:
             task.dependencies.append(after_task_id)
         
         self.tasks[task.id] = task
+        self.version += 1
         self._update_execution_order()
         self._save_to_database()
         return task.id
     
+    def add_tasks(self, tasks: List[Task]) -> List[str]:
+        """Add several tasks, reordering and persisting the queue once"""
+        tasks = list(tasks)
+        if not tasks:
+            return []
+        
+        for task in tasks:
+            self.tasks[task.id] = task
+        self.version += 1
+        self._update_execution_order()
+        self._save_to_database()
+        return [task.id for task in tasks]
+    
     def add_dependency(self, task_id: str, dependency_id: str) -> bool:
         """Add a dependency to an existing task"""
         if task_id not in self.tasks or dependency_id not in self.tasks:
@@ -178,6 +196,7 @@ class TaskQueue:
             return False
         
         self.tasks[task_id].dependencies.append(dependency_id)
+        self.version += 1
         self._update_execution_order()
         self._save_to_database()
         return True
@@ -206,14 +225,16 @@ class TaskQueue:
     
     def get_next_task(self) -> Optional[Task]:
         """Get highest priority available task"""
+        next_tasks = self.get_next_tasks(1)
+        return next_tasks[0] if next_tasks else None
+    
+    def get_next_tasks(self, limit: int) -> List[Task]:
+        """Get up to limit available tasks, highest priority first"""
         available_tasks = self._get_available_tasks()
         
-        if not available_tasks:
-            return None
-        
         # Sort by priority (highest first), then by creation time (oldest first)
         available_tasks.sort(key=lambda t: (-t.priority.value, t.created_at))
-        return available_tasks[0]
+        return available_tasks[:limit]
     
     def _get_available_tasks(self) -> List[Task]:
         """Get tasks that are ready to be executed"""
@@ -250,6 +271,7 @@ class TaskQueue:
         if task_id in self.failed_tasks:
             self.failed_tasks.remove(task_id)
         
+        self.version += 1
         self._update_execution_order()
         self._save_to_database()
         return True
@@ -265,6 +287,7 @@ class TaskQueue:
         if task_id not in self.failed_tasks:
             self.failed_tasks.append(task_id)
         
+        self.version += 1
         self._save_to_database()
         return True
     
@@ -281,6 +304,7 @@ class TaskQueue:
         if task_id in self.failed_tasks:
             self.failed_tasks.remove(task_id)
         
+        self.version += 1
         self._update_execution_order()
         self._save_to_database()
         return True
@@ -320,6 +344,7 @@ class TaskQueue:
         task.context_requirements = updated_task.context_requirements
         task.metadata.update(updated_task.metadata)
         
+        self.version += 1
         self._update_execution_order()
         self._save_to_database()
     
@@ -361,9 +386,14 @@ class TaskQueue:
         """Get all pending tasks"""
         return [task for task in self.tasks.values() if task.status == TaskStatus.PENDING]
     
-    def get_completed_tasks(self) -> List[Task]:
-        """Get all completed tasks"""
-        return [task for task in self.tasks.values() if task.status == TaskStatus.COMPLETED]
+    def get_completed_tasks(self, limit: Optional[int] = None) -> List[Task]:
+        """Get all completed tasks, or only the last `limit` of them"""
+        if limit is None:
+            return [task for task in self.tasks.values() if task.status == TaskStatus.COMPLETED]
+        
+        # Scan from the newest end so only the returned tasks are visited past the cutoff
+        newest_first = (task for task in reversed(self.tasks.values()) if task.status == TaskStatus.COMPLETED)
+        return list(islice(newest_first, limit))[::-1]
     
     def get_failed_tasks(self) -> List[Task]:
         """Get all failed tasks"""
@@ -371,14 +401,18 @@ class TaskQueue:
     
     def get_queue_statistics(self) -> Dict[str, int]:
         """Get statistics about the task queue"""
-        stats = {
-            'pending_tasks': len([t for t in self.tasks.values() if t.status == TaskStatus.PENDING]),
-            'in_progress_tasks': len([t for t in self.tasks.values() if t.status == TaskStatus.IN_PROGRESS]),
-            'completed_tasks': len([t for t in self.tasks.values() if t.status == TaskStatus.COMPLETED]),
-            'failed_tasks': len([t for t in self.tasks.values() if t.status == TaskStatus.FAILED]),
-            'total_tasks': len(self.tasks)
-        }
-        return stats
+        # Recount only when the queue has changed since the last call
+        if self._stats_cache is None or self._stats_cache[0] != self.version:
+            status_counts = Counter(t.status for t in self.tasks.values())
+            stats = {
+                'pending_tasks': status_counts[TaskStatus.PENDING],
+                'in_progress_tasks': status_counts[TaskStatus.IN_PROGRESS],
+                'completed_tasks': status_counts[TaskStatus.COMPLETED],
+                'failed_tasks': status_counts[TaskStatus.FAILED],
+                'total_tasks': len(self.tasks)
+            }
+            self._stats_cache = (self.version, stats)
+        return dict(self._stats_cache[1])
     
     def get_recent_completed_tasks(self, limit: int = 10) -> List[Task]:
         """Get the most recently completed tasks"""
@@ -417,6 +451,7 @@ class TaskQueue:
             if task_id in self.execution_order:
                 self.execution_order.remove(task_id)
         
+        self.version += 1
         self._save_to_database()
     
     def _save_to_database(self):
@@ -473,6 +508,8 @@ class TaskQueue:
                 self.completed_tasks = metadata.get('completed_tasks', [])
                 self.failed_tasks = metadata.get('failed_tasks', [])
             
+            self.version += 1
+            
         except sqlite3.OperationalError:
             # Database doesn't exist yet or is empty
             pass
@@ -0,0 +1,43 @@
+"""Tests for MemoryTree node updates"""
+
+from tree import MemoryTree, MemoryNode, create_root_node
+
+
+def make_tree(tmp_path):
+    tree = MemoryTree(str(tmp_path / "tree.db"))
+    root_id = tree.add_node(create_root_node("Case root", "Initial description"))
+    return tree, root_id
+
+
+def test_update_node_without_description_clears_it(tmp_path):
+    tree, root_id = make_tree(tmp_path)
+    version = tree.version
+
+    assert tree.update_node(root_id, description=None, name="Renamed root")
+
+    node = tree.get_node(root_id)
+    assert node.description == ""
+    assert node.name == "Renamed root"
+    assert node.content_lower == "renamed root "
+    assert tree.version == version + 1
+
+    reloaded = MemoryTree(str(tmp_path / "tree.db"))
+    assert reloaded.get_node(root_id).description == ""
+    tree.close()
+    reloaded.close()
+
+
+def test_node_with_null_description_loads(tmp_path):
+    node = MemoryNode.from_dict({
+        "id": "node-1",
+        "name": "Saved node",
+        "description": None,
+        "parent_id": None,
+        "children_ids": [],
+        "created_at": "2024-01-01T00:00:00",
+        "metadata": {},
+        "status": "pending",
+        "execution_result": None,
+    })
+    assert node.description == ""
+    assert node.content_tokens == frozenset({"saved", "node"})
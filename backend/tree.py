@@ -1,12 +1,41 @@
 import json
+import re
 import sqlite3
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 from uuid import uuid4
 from pathlib import Path
 
 
+# Length of the node ID prefix agents use to reference nodes
+ID_PREFIX_LENGTH = 8
+
+# Words in node names used for name lookup, skipping common filler words
+NAME_TOKEN_RE = re.compile(r'\w+')
+NAME_STOPWORDS = frozenset({'a', 'an', 'and', 'the', 'of', 'in', 'on', 'for', 'to', 'with', 'by'})
+
+# Applied once per tree connection; the default rollback journal is kept because the
+# API server watches the database file's mtime to pick up new nodes
+SQLITE_PRAGMAS = (
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -65536',
+)
+
+
+def name_tokens(text: str) -> List[str]:
+    """Split lowercased text into significant words for the name index"""
+    return [token for token in NAME_TOKEN_RE.findall(text) if token not in NAME_STOPWORDS]
+
+
+def token_fingerprint(tokens) -> int:
+    """Fold tokens into a 64-bit mask; nodes whose masks don't overlap share no tokens"""
+    bits = 0
+    for token in tokens:
+        bits |= 1 << (hash(token) & 63)
+    return bits
+
+
 class NodeStatus(Enum):
     """Status of a memory node"""
     PENDING = "pending"
@@ -18,8 +47,16 @@ class NodeStatus(Enum):
 class MemoryNode:
     """Individual node in the memory tree"""
     
+    # Fixed attribute layout: nodes are scanned in bulk during parent selection
+    __slots__ = (
+        'id', '_name', 'name_lower', '_description', 'parent_id', 'children_ids',
+        '_created_at', 'created_at_iso', 'metadata', 'status', 'execution_result', 'depth',
+        'content_lower', 'content_tokens', 'content_token_bits', '_content_derived',
+    )
+    
     def __init__(self, name: str, description: str = ""):
         self.id: str = str(uuid4())
+        self._description: str = ""  # Set below; the name setter reads it
         self.name: str = name
         self.description: str = description
         self.parent_id: Optional[str] = None
@@ -28,6 +65,52 @@ class MemoryNode:
         self.metadata: Dict[str, Any] = {}
         self.status: NodeStatus = NodeStatus.PENDING
         self.execution_result: Optional[str] = None
+        self.depth: int = 0  # Hops from the top of the tree, maintained by MemoryTree
+    
+    @property
+    def name(self) -> str:
+        return self._name
+    
+    @name.setter
+    def name(self, value: str):
+        # Keep a lowercased copy for case-insensitive name matching
+        self._name = value
+        self.name_lower: str = value.lower()
+        self._refresh_content_cache()
+    
+    @property
+    def created_at(self) -> datetime:
+        return self._created_at
+    
+    @created_at.setter
+    def created_at(self, value: datetime):
+        # Keep the ISO string too; it is written on every save and API response
+        self._created_at = value
+        self.created_at_iso: str = value.isoformat() if hasattr(value, 'isoformat') else str(value)
+    
+    @property
+    def description(self) -> str:
+        return self._description
+    
+    @description.setter
+    def description(self, value: Optional[str]):
+        # Agents may send an update without a description; store it as empty text
+        self._description = value if value is not None else ""
+        self._refresh_content_cache()
+    
+    def _refresh_content_cache(self):
+        """Cache lowercased name + description text and its significant words for content matching"""
+        self.content_lower: str = self.name_lower + " " + self._description.lower()
+        self.content_tokens: frozenset = frozenset(word for word in self.content_lower.split() if len(word) > 3)
+        self.content_token_bits: int = token_fingerprint(self.content_tokens)
+        self._content_derived: Dict[Callable[[str], Any], Any] = {}
+    
+    def content_derived(self, derive: Callable[[str], Any]) -> Any:
+        """Get derive(content_lower), computed once until the node's name or description changes"""
+        derived = self._content_derived
+        if derive not in derived:
+            derived[derive] = derive(self.content_lower)
+        return derived[derive]
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert node to dictionary for serialization"""
@@ -37,7 +120,7 @@ class MemoryNode:
             'description': self.description,
             'parent_id': self.parent_id,
             'children_ids': self.children_ids,
-            'created_at': self.created_at.isoformat(),
+            'created_at': self.created_at_iso,
             'metadata': self.metadata,
             'status': self.status.value,
             'execution_result': self.execution_result
@@ -64,12 +147,35 @@ class MemoryTree:
         self.nodes: Dict[str, MemoryNode] = {}
         self.root_id: Optional[str] = None
         self.db_path = db_path
+        self.version: int = 0  # Bumped on every mutation so caches can detect changes
+        self.id_prefix_index: Dict[str, List[str]] = {}  # ID prefix -> node IDs, in insertion order
+        self.name_index: Dict[str, Dict[str, None]] = {}  # Name word -> node IDs, in insertion order
+        self.node_positions: Dict[str, int] = {}  # Node ID -> ordinal that sorts like self.nodes
+        self._next_position = 0
+        self._deepest_node_id: Optional[str] = None  # Cached deepest non-root node, None when stale
+        self._conn: Optional[sqlite3.Connection] = None  # Opened on first use and reused for every save/load
+        self._stats_cache: Optional[tuple] = None  # (version, statistics)
         self._init_database()
         self.load_from_database()
     
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get the tree's SQLite connection, opening and tuning it on first use"""
+        if self._conn is None:
+            # Trees may be loaded on a worker thread and then used on the event loop; access is never concurrent
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            for pragma in SQLITE_PRAGMAS:
+                self._conn.execute(pragma)
+        return self._conn
+    
+    def close(self):
+        """Close the tree's SQLite connection; it is reopened if the tree is used again"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
     def _init_database(self):
         """Initialize SQLite database for persistence"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS nodes (
@@ -86,7 +192,6 @@ class MemoryTree:
             )
         ''')
         conn.commit()
-        conn.close()
     
     # Core Operations
     def add_node(self, node: MemoryNode, parent_id: Optional[str] = None) -> str:
@@ -97,13 +202,24 @@ class MemoryTree:
         # Set parent-child relationships
         if parent_id:
             node.parent_id = parent_id
+            node.depth = self.nodes[parent_id].depth + 1
             self.nodes[parent_id].children_ids.append(node.id)
         else:
             # This is a root node
+            node.depth = 0
             if self.root_id is None:
                 self.root_id = node.id
         
         self.nodes[node.id] = node
+        if node.id not in self.node_positions:
+            self.node_positions[node.id] = self._next_position
+            self._next_position += 1
+        self.id_prefix_index.setdefault(node.id[:ID_PREFIX_LENGTH], []).append(node.id)
+        self._index_name(node.id, node.name_lower)
+        deepest = self.nodes.get(self._deepest_node_id) if self._deepest_node_id else None
+        if deepest and node.id != self.root_id and node.depth > deepest.depth:
+            self._deepest_node_id = node.id
+        self.version += 1
         self._save_to_database()
         return node.id
     
@@ -127,6 +243,14 @@ class MemoryTree:
             self.root_id = None
         
         del self.nodes[node_id]
+        prefix_ids = self.id_prefix_index.get(node_id[:ID_PREFIX_LENGTH], [])
+        if node_id in prefix_ids:
+            prefix_ids.remove(node_id)
+            if not prefix_ids:
+                del self.id_prefix_index[node_id[:ID_PREFIX_LENGTH]]
+        self._unindex_name(node_id, node.name_lower)
+        del self.node_positions[node_id]
+        self.version += 1
         self._save_to_database()
         return True
     
@@ -136,13 +260,97 @@ class MemoryTree:
             return False
         
         node = self.nodes[node_id]
+        old_name_lower = node.name_lower
         for key, value in kwargs.items():
             if hasattr(node, key):
                 setattr(node, key, value)
         
+        if node.name_lower != old_name_lower:
+            self._unindex_name(node_id, old_name_lower)
+            self._index_name(node_id, node.name_lower)
+        
+        if 'parent_id' in kwargs:
+            self._recompute_depths()
+        
+        self.version += 1
         self._save_to_database()
         return True
     
+    def _recompute_depths(self):
+        """Recompute cached node depths after nodes are loaded or re-parented"""
+        depths: Dict[str, int] = {}
+        for node_id in self.nodes:
+            # Walk up until reaching the top of the tree or a node with a known depth
+            path = []
+            current_id = node_id
+            while current_id in self.nodes and current_id not in depths and current_id not in path:
+                path.append(current_id)
+                parent_id = self.nodes[current_id].parent_id
+                if current_id == self.root_id or not parent_id:
+                    current_id = None
+                    break
+                current_id = parent_id
+            
+            if current_id is None:
+                base_depth = -1  # Path ends at a top-level node
+            else:
+                base_depth = depths.get(current_id, 0)  # Known node, or missing/cyclic parent
+            
+            for offset, path_id in enumerate(reversed(path), start=1):
+                depths[path_id] = base_depth + offset
+        
+        for node_id, depth in depths.items():
+            self.nodes[node_id].depth = depth
+        self._deepest_node_id = None
+    
+    def get_deepest_node(self) -> Optional[str]:
+        """Get the ID of the first deepest non-root node"""
+        if self._deepest_node_id not in self.nodes:
+            # Recompute lazily after removals or depth changes
+            candidates = [node_id for node_id in self.nodes if node_id != self.root_id]
+            self._deepest_node_id = max(candidates, key=lambda node_id: self.nodes[node_id].depth) if candidates else None
+        return self._deepest_node_id
+    
+    def _rebuild_lookup_indexes(self):
+        """Rebuild the ID prefix, name and position indexes after nodes are loaded"""
+        self.id_prefix_index = {}
+        self.name_index = {}
+        self.node_positions = {}
+        for position, (node_id, node) in enumerate(self.nodes.items()):
+            self.id_prefix_index.setdefault(node_id[:ID_PREFIX_LENGTH], []).append(node_id)
+            self._index_name(node_id, node.name_lower)
+            self.node_positions[node_id] = position
+        self._next_position = len(self.nodes)
+    
+    def _index_name(self, node_id: str, name_lower: str):
+        """Add a node under each significant word of its name"""
+        for token in name_tokens(name_lower):
+            self.name_index.setdefault(token, {})[node_id] = None
+    
+    def _unindex_name(self, node_id: str, name_lower: str):
+        """Remove a node from the name index entries of its name"""
+        for token in name_tokens(name_lower):
+            node_ids = self.name_index.get(token)
+            if node_ids is not None:
+                node_ids.pop(node_id, None)
+                if not node_ids:
+                    del self.name_index[token]
+    
+    def find_nodes_sharing_name_words(self, text: str) -> List[str]:
+        """Get IDs of nodes whose names share a significant word with text, in tree order"""
+        candidates: Dict[str, None] = {}
+        for token in name_tokens(text.lower()):
+            candidates.update(self.name_index.get(token, {}))
+        return sorted(candidates, key=self.node_positions.__getitem__)
+    
+    def find_node_by_id_prefix(self, id_prefix: str) -> Optional[str]:
+        """Return the first node ID starting with the given prefix"""
+        if len(id_prefix) >= ID_PREFIX_LENGTH:
+            candidates = self.id_prefix_index.get(id_prefix[:ID_PREFIX_LENGTH], ())
+        else:
+            candidates = self.nodes
+        return next((node_id for node_id in candidates if node_id.startswith(id_prefix)), None)
+    
     def get_node(self, node_id: str) -> Optional[MemoryNode]:
         """Get a specific node by ID"""
         return self.nodes.get(node_id)
@@ -190,6 +398,13 @@ class MemoryTree:
         
         return siblings
     
+    def count_siblings(self, node_id: str) -> int:
+        """Count sibling nodes (same parent) without building the list"""
+        node = self.nodes.get(node_id)
+        if not node or not node.parent_id:
+            return 0
+        return sum(1 for child_id in self.nodes[node.parent_id].children_ids if child_id != node_id)
+    
     def get_path_to_root(self, node_id: str) -> List[MemoryNode]:
         """Get path from node to root"""
         if node_id not in self.nodes:
@@ -220,7 +435,7 @@ class MemoryTree:
         matching_nodes = []
         
         for node in self.nodes.values():
-            if (keyword_lower in node.name.lower() or 
+            if (keyword_lower in node.name_lower or 
                 keyword_lower in node.description.lower()):
                 matching_nodes.append(node)
         
@@ -228,87 +443,76 @@ class MemoryTree:
     
     def get_tree_statistics(self) -> Dict[str, Any]:
         """Get comprehensive tree statistics for connected tree nodes only"""
-        # Get only connected nodes (nodes reachable from root)
-        connected_nodes = self._get_connected_nodes()
-        
-        stats = {
-            'total_nodes': len(connected_nodes),
-            'root_children': len(self._get_children(self.root_id)) if self.root_id else 0,
-            'max_depth': self._calculate_max_depth(),
-            'nodes_by_status': self._count_connected_nodes_by_status(connected_nodes),
-            'average_children': self._calculate_average_children_connected(connected_nodes),
-            'leaf_nodes': len([n for n in connected_nodes if not self._get_children(n.id)])
-        }
+        if self._stats_cache is None or self._stats_cache[0] != self.version:
+            self._stats_cache = (self.version, self._compute_tree_statistics())
+        stats = dict(self._stats_cache[1])
+        stats['nodes_by_status'] = dict(stats['nodes_by_status'])
         return stats
     
-    def _get_connected_nodes(self) -> List[MemoryNode]:
-        """Get all nodes connected to the tree (reachable from root)"""
-        if not self.root_id or self.root_id not in self.nodes:
-            return []
+    def _compute_tree_statistics(self) -> Dict[str, Any]:
+        """Tally connected-node statistics in a single walk from the root"""
+        connected_count = 0
+        status_counts = {}
+        total_children = 0
+        leaf_nodes = 0
         
-        connected = []
+        # Pre-order walk over nodes reachable from root, children in order
         visited = set()
-        
-        def traverse(node_id: str):
+        stack = [self.root_id] if self.root_id in self.nodes else []
+        while stack:
+            node_id = stack.pop()
             if node_id in visited or node_id not in self.nodes:
-                return
-            
+                continue
             visited.add(node_id)
-            connected.append(self.nodes[node_id])
+            node = self.nodes[node_id]
             
-            # Traverse children
-            for child_id in self.nodes[node_id].children_ids:
-                traverse(child_id)
-        
-        traverse(self.root_id)
-        return connected
-    
-    def _count_connected_nodes_by_status(self, connected_nodes: List[MemoryNode]) -> Dict[str, int]:
-        """Count connected nodes by their status"""
-        status_counts = {}
-        for node in connected_nodes:
+            connected_count += 1
             status = node.status.value if hasattr(node.status, 'value') else str(node.status)
             status_counts[status] = status_counts.get(status, 0) + 1
-        return status_counts
-    
-    def _calculate_average_children_connected(self, connected_nodes: List[MemoryNode]) -> float:
-        """Calculate average number of children per connected node"""
-        if not connected_nodes:
-            return 0.0
+            child_count = sum(1 for child_id in node.children_ids if child_id in self.nodes)
+            total_children += child_count
+            if not child_count:
+                leaf_nodes += 1
+            stack.extend(reversed(node.children_ids))
         
-        total_children = sum(len(self._get_children(node.id)) for node in connected_nodes)
-        return total_children / len(connected_nodes)
+        return {
+            'total_nodes': connected_count,
+            'root_children': len(self._get_children(self.root_id)) if self.root_id else 0,
+            'max_depth': self._calculate_max_depth(),
+            'nodes_by_status': status_counts,
+            'average_children': total_children / connected_count if connected_count else 0.0,
+            'leaf_nodes': leaf_nodes
+        }
     
     def _calculate_max_depth(self) -> int:
         """Calculate the maximum depth of the tree"""
         if not self.nodes:
             return 0
         
-        def get_depth(node_id: str, visited: set = None) -> int:
-            if visited is None:
-                visited = set()
-            
-            if node_id in visited:
-                return 0  # Avoid infinite loops
-            
-            visited.add(node_id)
-            node = self.nodes.get(node_id)
-            if not node:
-                return 0
-            
-            children = self._get_children(node_id)
-            if not children:
-                return 1
-            
-            max_child_depth = max(get_depth(child.id, visited.copy()) for child in children)
-            return 1 + max_child_depth
-        
         # Find root nodes and calculate depth from each
-        root_nodes = [n for n in self.nodes.values() if n.parent_id is None]
+        root_nodes = [node_id for node_id, node in self.nodes.items() if node.parent_id is None]
         if not root_nodes:
             return 1
         
-        return max(get_depth(root.id) for root in root_nodes)
+        # Post-order walk with memoized subtree heights; a child already on the
+        # current path (a cycle) counts as 0 so loops terminate
+        heights: Dict[str, int] = {}
+        on_path = set()
+        for root_id in root_nodes:
+            stack = [(root_id, False)]
+            while stack:
+                node_id, children_done = stack.pop()
+                children = [child_id for child_id in self.nodes[node_id].children_ids if child_id in self.nodes]
+                if children_done:
+                    on_path.discard(node_id)
+                    heights[node_id] = 1 + max((heights.get(child_id, 0) for child_id in children), default=0)
+                elif node_id not in heights:
+                    on_path.add(node_id)
+                    stack.append((node_id, True))
+                    stack.extend((child_id, False) for child_id in children
+                                 if child_id not in heights and child_id not in on_path)
+        
+        return max(heights[root_id] for root_id in root_nodes)
     
     def _count_nodes_by_status(self) -> Dict[str, int]:
         """Count nodes by their status"""
@@ -353,7 +557,7 @@ class MemoryTree:
                 'name': node.name,
                 'description': node.description[:100] + "..." if len(node.description) > 100 else node.description,
                 'status': node.status.value,
-                'created_at': node.created_at.isoformat(),
+                'created_at': node.created_at_iso,
                 'children': children
             }
         
@@ -433,36 +637,39 @@ class MemoryTree:
         
         for node_id, node_data in tree_data.get('nodes', {}).items():
             self.nodes[node_id] = MemoryNode.from_dict(node_data)
+        
+        self._recompute_depths()
+        self._rebuild_lookup_indexes()
+        self.version += 1
     
     def _save_to_database(self):
         """Save current tree state to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self._get_connection()
         
-        # Clear existing data
-        cursor.execute('DELETE FROM nodes')
-        cursor.execute('DELETE FROM tree_metadata')
-        
-        # Save nodes
-        for node_id, node in self.nodes.items():
+        # Commit on success, roll back on error so the shared connection never holds a stale transaction
+        with conn:
+            cursor = conn.cursor()
+            
+            # Clear existing data
+            cursor.execute('DELETE FROM nodes')
+            cursor.execute('DELETE FROM tree_metadata')
+            
+            # Save nodes
+            for node_id, node in self.nodes.items():
+                cursor.execute(
+                    'INSERT INTO nodes (id, data) VALUES (?, ?)',
+                    (node_id, json.dumps(node.to_dict()))
+                )
+            
+            # Save metadata
             cursor.execute(
-                'INSERT INTO nodes (id, data) VALUES (?, ?)',
-                (node_id, json.dumps(node.to_dict()))
+                'INSERT INTO tree_metadata (key, value) VALUES (?, ?)',
+                ('root_id', self.root_id or '')
             )
-        
-        # Save metadata
-        cursor.execute(
-            'INSERT INTO tree_metadata (key, value) VALUES (?, ?)',
-            ('root_id', self.root_id or '')
-        )
-        
-        conn.commit()
-        conn.close()
     
     def load_from_database(self):
         """Load tree state from database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._get_connection().cursor()
         
         try:
             # Load nodes
@@ -478,12 +685,13 @@ class MemoryTree:
             cursor.execute('SELECT value FROM tree_metadata WHERE key = ?', ('root_id',))
             root_result = cursor.fetchone()
             self.root_id = root_result[0] if root_result and root_result[0] else None
+            self._recompute_depths()
+            self._rebuild_lookup_indexes()
+            self.version += 1
             
         except sqlite3.OperationalError:
             # Database doesn't exist yet or is empty
             pass
-        
-        conn.close()
 
     def get_recent_nodes(self, limit: int = 10) -> List[MemoryNode]:
         """Get the most recently created nodes"""
@@ -11,6 +11,11 @@ interface TreeNode {
   children?: TreeNode[];
 }
 
+// Node fields plus child IDs, as sent in tree_patch messages
+interface FlatTreeNode extends Omit<TreeNode, 'children'> {
+  child_ids: string[];
+}
+
 interface TreeStats {
   total_nodes: number;
   max_depth: number;
@@ -27,6 +32,32 @@ const MemoryTreeView: React.FC = () => {
   const [isConnected, setIsConnected] = useState(false);
   const [lastUpdate, setLastUpdate] = useState<string>('');
   const wsRef = useRef<WebSocket | null>(null);
+  // Flat copy of the current tree so tree_patch messages can be applied
+  const nodeMapRef = useRef<Map<string, FlatTreeNode>>(new Map());
+  const rootIdRef = useRef<string | null>(null);
+
+  const indexTree = (tree: TreeNode) => {
+    const nodeMap = new Map<string, FlatTreeNode>();
+    const stack: TreeNode[] = [tree];
+    while (stack.length > 0) {
+      const { children = [], ...fields } = stack.pop()!;
+      nodeMap.set(fields.id, { ...fields, child_ids: children.map(child => child.id) });
+      stack.push(...children);
+    }
+    nodeMapRef.current = nodeMap;
+    rootIdRef.current = tree.id;
+  };
+
+  const buildTree = (nodeId: string, visited: Set<string> = new Set()): TreeNode | null => {
+    const entry = nodeMapRef.current.get(nodeId);
+    if (!entry || visited.has(nodeId)) return null;
+    visited.add(nodeId);
+    const { child_ids, ...fields } = entry;
+    const children = child_ids
+      .map(childId => buildTree(childId, visited))
+      .filter((child): child is TreeNode => child !== null);
+    return { ...fields, children };
+  };
 
   const fetchTreeData = async () => {
     setIsLoading(true);
@@ -61,6 +92,7 @@ const MemoryTreeView: React.FC = () => {
       // Use real data from API
       if (treeResult.data) {
         console.log('🌳 Setting real tree data from API:', treeResult.data.name);
+        indexTree(treeResult.data);
         setTreeData(treeResult.data);
         setIsLoading(false);
         setError(null);
@@ -138,6 +170,7 @@ const MemoryTreeView: React.FC = () => {
                 childrenCount: message.data.tree.children?.length || 0,
                 status: message.data.tree.status
               });
+              indexTree(message.data.tree);
               setTreeData(message.data.tree);
               setIsLoading(false);
               setError(null);
@@ -157,6 +190,36 @@ const MemoryTreeView: React.FC = () => {
             setIsConnected(true);
           }
           
+          if (message.type === 'tree_patch') {
+            const { root_id, added, updated, removed, stats } = message.data;
+            console.log('🩹 Received tree patch:', {
+              added: added.length,
+              updated: updated.length,
+              removed: removed.length
+            });
+            
+            if (rootIdRef.current !== root_id) {
+              // Patch doesn't apply to the tree we hold, reload it in full
+              console.log('⚠️ Tree patch is for a different root, refetching tree');
+              fetchTreeData();
+            } else {
+              const nodeMap = nodeMapRef.current;
+              [...added, ...updated].forEach((entry: FlatTreeNode) => nodeMap.set(entry.id, entry));
+              removed.forEach((nodeId: string) => nodeMap.delete(nodeId));
+              const tree = buildTree(root_id);
+              if (tree) {
+                setTreeData(tree);
+              }
+            }
+            
+            if (stats) {
+              setTreeStats(stats);
+            }
+            
+            setLastUpdate(new Date().toLocaleTimeString());
+            setIsConnected(true);
+          }
+          
         } catch (err) {
           console.error('❌ Error parsing WebSocket message:', err);
           console.log('📨 Raw unparseable message:', event.data);